@@ -2,7 +2,7 @@
 Pydantic models for API request and response validation
 """
 
-from typing import List, Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel
 
 
@@ -24,4 +24,29 @@ class TextExtractionResponse(BaseModel):
 class VideoProcessingRequest(BaseModel):
     """Request model for video processing parameters"""
     frame_interval: Optional[int] = 30  # Extract text every N frames
-    confidence_threshold: Optional[float] = 0.5  # OCR confidence threshold
\ No newline at end of file
+    sample_rate: Optional[float] = None  # Samples per second; overrides frame_interval
+    confidence_threshold: Optional[float] = 0.5  # OCR confidence threshold
+    ocr_mode: Optional[Literal["accurate", "fast", "incremental"]] = "accurate"  # "fast": text regions only; "incremental": changed lines only
+    ocr_engine: Optional[Literal["auto", "tesserocr", "pytesseract"]] = "auto"  # "auto" prefers in-process tesserocr
+    decode_backend: Optional[Literal["opencv", "ffmpeg", "pyav"]] = "opencv"  # "ffmpeg": threaded, hardware-accelerated where available; "pyav" needs PyAV
+    decode_threads: Optional[int] = 0  # Decoder threads for "ffmpeg"/"pyav"; 0 = one per CPU
+    decode_gray: Optional[bool] = False  # Decode straight to grayscale; descriptions then see gray frames
+    decode_max_height: Optional[int] = None  # Downscale taller frames while decoding (None = full resolution)
+    change_scale: Optional[float] = 1.0  # Thumbnail scale for change detection; 1.0 = full resolution
+    frame_selection: Optional[Literal["adaptive", "fixed"]] = "adaptive"  # Per-video noise floor with settling, or std_diff > 4
+    settle_seconds: Optional[float] = 0.5  # Adaptive: how long a changed picture must be stable before it is selected
+    ocr_workers: Optional[int] = 0  # Tesseract worker processes; 0 runs OCR inline
+    ocr_queue_size: Optional[int] = 16  # Max decoded frames waiting for OCR
+    llm_concurrency: Optional[int] = 4  # Gemini description requests in flight for this job (LLM_PROCESS_CONCURRENCY caps the process)
+    llm_rate_limit: Optional[float] = 4.0  # Gemini requests per second for this job, None = unlimited (LLM_PROCESS_RATE_LIMIT caps the process)
+    llm_max_retries: Optional[int] = 3  # Retries with exponential backoff per frame
+    image_descriptions: Optional[bool] = True  # Describe selected frames with Gemini; False runs OCR only
+    llm_batch_size: Optional[int] = 4  # Frames described per Gemini request
+    description_cache: Optional[bool] = True  # Reuse stored descriptions of frames with identical image content
+    consolidate: Optional[bool] = True  # Merge consecutive entries of the same slide into one segment with start and end time
+    consolidate_similarity: Optional[float] = 0.7  # Min estimated text similarity (Jaccard of character shingles) within a segment
+    dedup_enabled: Optional[bool] = True  # Reuse results for repeated slides
+    dedup_max_distance: Optional[int] = 2  # Max perceptual-hash Hamming distance for a repeat candidate
+    result_cache: Optional[bool] = True  # Reuse stored results for identical video + parameters
+    save_frames: Optional[bool] = False  # Dump selected frames as JPEGs (debugging)
+    segment_seconds: Optional[float] = 600.0  # Background jobs split longer videos into parallel segments; 0 disables
@@ -6,25 +6,18 @@ from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
 from app.models.schemas import TextExtractionResponse, VideoProcessingRequest
 from app.services.video_service import text_extractor_from_video, validate_video_file
 from app.services.LLM_service import test_api_connection
-import requests  # CORRECT!
-import cv2
-import os
-from PIL import Image
-import google.generativeai as genai
-from dotenv import load_dotenv
+from app.services.upload_service import UploadTooLargeError
 
 router = APIRouter()
 
 
 @router.post("/extract-text")
-async def extract_text_from_video_endpoint(video_file: UploadFile = File(...)):
+async def extract_text_from_video_endpoint(
+    video_file: UploadFile = File(...),
+    params: VideoProcessingRequest = Depends()
+):
     try:
-        # If params not provided, set defaults
-        # if params is None:
-        #     from app.models.schemas import VideoProcessingRequest
-        #     params = VideoProcessingRequest(frame_interval=1, confidence_threshold=0.5) # what is this?
-
-        result = await text_extractor_from_video(video_file)
+        result = await text_extractor_from_video(video_file, params)
         # ✅ Ensure fully structured JSON response
         response = {
             "success": True,
@@ -32,9 +25,18 @@ async def extract_text_from_video_endpoint(video_file: UploadFile = File(...)):
             "extracted_text": result.get("extracted_text", []),
             "detailed_extraction": result.get("detailed_extraction", []),
             "frame_count": result.get("frame_count", 0),
+            "segment_count": result.get("segment_count"),
+            "dedup_cache_hits": result.get("dedup_cache_hits", 0),
+            "ocr_timing": result.get("ocr_timing"),
+            "frame_selection": result.get("frame_selection"),
+            "consolidation": result.get("consolidation"),
+            "metrics": result.get("metrics"),
             "processing_time": result.get("processing_time", 0),
+            "cache_hit": result.get("cache_hit", False),
         }
         return response
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing video: {str(e)}")
 
@@ -1,18 +1,180 @@
+import asyncio
+import hashlib
+import json
+import random
+import sqlite3
+import threading
+import time
+import weakref
 import cv2
 import os
-from PIL import Image
-import google.generativeai as genai
+from contextlib import asynccontextmanager
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
 from dotenv import load_dotenv
 
+from app.services.description_cache import DescriptionCache
+
 # Load environment variables from a .env file
 load_dotenv()
 
-# Configure the Gemini API key
-api_key = os.environ.get("GOOGLE_API_KEY")
-if not api_key:
-    raise RuntimeError("GOOGLE_API_KEY environment variable not set.")
 
-genai.configure(api_key=api_key)
+MODEL_NAME = 'gemini-2.0-flash-exp'
+SYSTEM_INSTRUCTION = (
+    "You are a helpful assistant that analyzes frames from lecture videos. "
+    "Describe what is visible on the screen concisely and objectively."
+)
+PROMPT = "Describe what is shown in this image concisely."
+BATCH_PROMPT = (
+    "Below are {count} numbered frames from the same lecture video. "
+    "Describe what is shown in each frame concisely, independently of the others. "
+    "Answer with a JSON array holding one object per frame, in order: "
+    '{{"frame": <frame number>, "description": "<description>"}}.'
+)
+# Bump when a prompt change should invalidate cached descriptions
+PROMPT_VERSION = 1
+
+# Frames are downscaled so their longest side is at most this many pixels
+# and sent as JPEG; slide text stays legible and requests stay small
+IMAGE_MAX_SIDE = 1024
+JPEG_QUALITY = 85
+
+# How long a partial batch waits for more frames before it is sent
+BATCH_WAIT_SECONDS = 0.5
+
+# Gemini requests in flight and started per second across every
+# description stage of one process (the API server, or one job worker);
+# with N worker processes on a key, the key sees up to N times these
+LLM_PROCESS_CONCURRENCY = int(os.environ.get("LLM_PROCESS_CONCURRENCY", "4"))
+LLM_PROCESS_RATE_LIMIT = float(os.environ.get("LLM_PROCESS_RATE_LIMIT", "4.0"))
+
+_genai = None
+_model = None
+
+
+def get_genai():
+    """
+    Import and configure google.generativeai on first use
+
+    The package takes most of a second to import, so OCR-only runs and
+    processes that never describe a frame do not load it.
+
+    Raises:
+        RuntimeError: If GOOGLE_API_KEY is not set
+    """
+    global _genai
+    if _genai is None:
+        api_key = os.environ.get("GOOGLE_API_KEY")
+        if not api_key:
+            raise RuntimeError("GOOGLE_API_KEY environment variable not set.")
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        _genai = genai
+    return _genai
+
+
+def _build_model():
+    """Create the Gemini model used for frame descriptions"""
+    return get_genai().GenerativeModel(
+        model_name=MODEL_NAME,
+        system_instruction=SYSTEM_INSTRUCTION
+    )
+
+
+def get_model():
+    """Return the process-wide Gemini model, creating it on first use"""
+    global _model
+    if _model is None:
+        _model = _build_model()
+    return _model
+
+
+# Generation settings are plain dicts (accepted wherever genai expects a
+# GenerationConfig) so building a request does not import the package
+
+def _generation_config() -> dict:
+    """Generation settings shared by the sync and async description paths"""
+    return {"max_output_tokens": 100, "temperature": 0.1}
+
+
+def _batch_generation_config(count: int) -> dict:
+    """Generation settings for a request describing count frames at once"""
+    return {
+        "max_output_tokens": 120 * count,
+        "temperature": 0.1,
+        "response_mime_type": "application/json",
+        "response_schema": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"frame": {"type": "integer"}, "description": {"type": "string"}},
+                "required": ["frame", "description"],
+            },
+        },
+    }
+
+
+def _frame_to_image(frame) -> dict:
+    """Downscale an OpenCV BGR frame and encode it as a JPEG image part"""
+    height, width = frame.shape[:2]
+    scale = IMAGE_MAX_SIDE / max(height, width)
+    if scale < 1:
+        frame = cv2.resize(frame, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA)
+    ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+    if not ok:
+        raise ValueError("Could not encode frame as JPEG")
+    return {"mime_type": "image/jpeg", "data": encoded.tobytes()}
+
+
+def _prepare_frame(frame) -> Tuple[str, dict]:
+    """Image part of a frame and the SHA-256 of the JPEG bytes sent to Gemini"""
+    image = _frame_to_image(frame)
+    return hashlib.sha256(image["data"]).hexdigest(), image
+
+
+def _description(response) -> Optional[str]:
+    """Text of a Gemini response, or None when it was blocked or empty"""
+    if response.prompt_feedback.block_reason or not response.text:
+        return None
+    return response.text.strip()
+
+
+def _response_text(response) -> str:
+    """Turn a Gemini response into the description string returned to callers"""
+    # Check if response was blocked
+    if response.prompt_feedback.block_reason:
+        return f"Response blocked: {response.prompt_feedback.block_reason}"
+
+    # Handle cases where response has no text
+    if not response.text:
+        return "No text generated. Response may have been filtered."
+
+    return response.text.strip()
+
+
+def _parse_batch(response, count: int) -> List[Optional[str]]:
+    """
+    Per-frame descriptions of a batch response
+
+    Returns:
+        List of count descriptions; None for frames the response is missing
+        or when it is blocked or not valid JSON
+    """
+    descriptions = [None] * count
+    text = _description(response)
+    if text is None:
+        return descriptions
+    try:
+        items = json.loads(text)
+    except ValueError:
+        return descriptions
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        number, description = item.get("frame"), item.get("description")
+        if isinstance(number, int) and 1 <= number <= count and isinstance(description, str) and description.strip():
+            descriptions[number - 1] = description.strip()
+    return descriptions
 
 
 def extract_screen_description(frame) -> str:
@@ -21,44 +183,15 @@ def extract_screen_description(frame) -> str:
     of what is shown in the frame using the Gemini Flash model.
     """
     try:
-        # Convert OpenCV BGR frame to RGB, as PIL and Gemini expect RGB
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        pil_image = Image.fromarray(frame_rgb)
-        print("Converted frame to PIL image.")
-
-        # Initialize the Gemini model - using 1.5 Flash which is more stable
-        model = genai.GenerativeModel(
-            model_name='gemini-2.0-flash-exp',
-            system_instruction=(
-                "You are a helpful assistant that analyzes frames from lecture videos. "
-                "Describe what is visible on the screen concisely and objectively."
-            )
-        )
-
-        # Define generation configuration for the model
-        generation_config = genai.GenerationConfig(
-            max_output_tokens=100,
-            temperature=0.1
-        )
-
-        # Simpler prompt
-        prompt = "Describe what is shown in this image concisely."
+        image = _frame_to_image(frame)
 
         # Generate content using the model without safety settings
-        response = model.generate_content(
-            [prompt, pil_image],
-            generation_config=generation_config
+        response = get_model().generate_content(
+            [PROMPT, image],
+            generation_config=_generation_config()
         )
 
-        # Check if response was blocked
-        if response.prompt_feedback.block_reason:
-            return f"Response blocked: {response.prompt_feedback.block_reason}"
-
-        # Handle cases where response has no text
-        if not response.text:
-            return "No text generated. Response may have been filtered."
-
-        return response.text.strip()
+        return _response_text(response)
 
     except Exception as e:
         print(f"Error processing frame: {e}")
@@ -68,13 +201,292 @@ def extract_screen_description(frame) -> str:
         return f"Error: {str(e)}"
 
 
+class TokenBucket:
+    """
+    Async token-bucket rate limiter
+
+    Tokens are reserved under a thread lock and the wait happens outside it,
+    so one bucket can be shared by event loops in different threads or run
+    one after another.
+
+    Args:
+        rate: Tokens added per second; None or 0 disables limiting
+        capacity: Maximum burst size (defaults to max(1, rate))
+    """
+
+    def __init__(self, rate: Optional[float], capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate or 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        if not self.rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Take the token now, going into debt when none is left; later
+            # callers wait behind the debt, so they are served in order
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class RequestLimiter:
+    """
+    Concurrency and rate limit shared by every DescriptionStage of a process
+
+    The rate is enforced across all event loops of the process. The
+    concurrency cap is kept per event loop, which covers the process: the
+    API server runs one loop and job workers run their jobs one at a time.
+
+    Args:
+        concurrency: Maximum requests in flight
+        rate_limit: Maximum requests started per second (None or 0 = unlimited)
+    """
+
+    def __init__(self, concurrency: int, rate_limit: Optional[float]):
+        self.concurrency = max(1, concurrency or 1)
+        self.bucket = TokenBucket(rate_limit)
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._semaphores[loop] = asyncio.Semaphore(self.concurrency)
+        return semaphore
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one of the shared request slots, started within the rate limit"""
+        async with self._semaphore():
+            await self.bucket.acquire()
+            yield
+
+
+_request_limiter: Optional[RequestLimiter] = None
+
+
+def get_request_limiter() -> RequestLimiter:
+    """Return the process-wide limiter (LLM_PROCESS_CONCURRENCY, LLM_PROCESS_RATE_LIMIT)"""
+    global _request_limiter
+    if _request_limiter is None:
+        _request_limiter = RequestLimiter(LLM_PROCESS_CONCURRENCY, LLM_PROCESS_RATE_LIMIT)
+    return _request_limiter
+
+
+class DescriptionStage:
+    """
+    Concurrent, rate-limited Gemini description stage running on an event loop
+
+    Frames are submitted from any thread with submit(); requests fan out on the
+    loop, bounded by the stage's own semaphore and token bucket and by the
+    process-wide RequestLimiter, and failed calls are retried with
+    exponential backoff. concurrency and rate_limit therefore cap one
+    extraction, while the shared limiter caps the process however many
+    extractions run in it. With batch_size > 1, frames are packed
+    into multi-image requests answered with one JSON description per frame;
+    frames a batch answer leaves out are described on their own. Must be
+    created inside a running loop.
+
+    Args:
+        client: Object exposing an async generate_content_async(contents,
+            generation_config=...) like genai.GenerativeModel; a local fake can
+            be passed here for testing. Defaults to the shared Gemini model.
+        concurrency: Maximum number of requests in flight
+        rate_limit: Maximum requests started per second (None = unlimited)
+        max_retries: Retries after the first failed attempt
+        backoff: Initial retry delay in seconds, doubled on each retry
+        max_pending: Maximum submitted frames not yet described; submit()
+            blocks beyond this so frames do not pile up in memory
+        batch_size: Frames described per request
+        batch_wait: Seconds a partial batch waits for more frames
+        cache: Optional DescriptionCache consulted by perceptual hash before
+            any request is made
+        limiter: RequestLimiter shared with other stages; defaults to the
+            process-wide one from get_request_limiter()
+    """
+
+    def __init__(
+        self,
+        client=None,
+        concurrency: int = 4,
+        rate_limit: Optional[float] = 4.0,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+        max_pending: Optional[int] = None,
+        batch_size: int = 1,
+        batch_wait: float = BATCH_WAIT_SECONDS,
+        cache: Optional[DescriptionCache] = None,
+        limiter: Optional[RequestLimiter] = None
+    ):
+        self.client = client if client is not None else get_model()
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.batch_size = max(1, batch_size or 1)
+        self.batch_wait = batch_wait
+        self.cache = cache
+        self._loop = asyncio.get_running_loop()
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._bucket = TokenBucket(rate_limit)
+        self._limiter = limiter if limiter is not None else get_request_limiter()
+        self._pending = threading.BoundedSemaphore(max_pending or max(1, concurrency) * 4 * self.batch_size)
+        self._batch: List[Tuple[dict, asyncio.Future]] = []
+        self._batch_timer: Optional[asyncio.TimerHandle] = None
+        self._batch_tasks = set()
+        # Seconds spent waiting on the client, summed over requests, frames
+        # whose description failed after all retries, requests sent and
+        # frames answered from the cache
+        self.request_seconds = 0.0
+        self.failures = 0
+        self.requests = 0
+        self.cache_hits = 0
+
+    async def _request(self, contents, generation_config):
+        """Send one request, retrying transient failures; raises the last error"""
+        delay = self.backoff
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._semaphore:
+                    await self._bucket.acquire()
+                    async with self._limiter.slot():
+                        started = time.perf_counter()
+                        self.requests += 1
+                        try:
+                            return await self.client.generate_content_async(
+                                contents,
+                                generation_config=generation_config
+                            )
+                        finally:
+                            self.request_seconds += time.perf_counter() - started
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                print(f"Description attempt {attempt + 1} failed ({e}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay + random.uniform(0, delay / 10))
+                delay = min(delay * 2, 30.0)
+
+    async def _describe_one(self, image: dict) -> Tuple[str, bool]:
+        """Description of a single image, and whether it may be cached"""
+        response = await self._request([PROMPT, image], _generation_config())
+        return _response_text(response), _description(response) is not None
+
+    async def _describe_batch(self, batch: List[Tuple[dict, asyncio.Future]]):
+        images = [image for image, _ in batch]
+        if len(images) == 1:
+            results = await asyncio.gather(self._describe_one(images[0]), return_exceptions=True)
+        else:
+            contents = [BATCH_PROMPT.format(count=len(images))]
+            for number, image in enumerate(images, 1):
+                contents += [f"Frame {number}:", image]
+            try:
+                response = await self._request(contents, _batch_generation_config(len(images)))
+                descriptions = _parse_batch(response, len(images))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                return
+            missing = [i for i, description in enumerate(descriptions) if description is None]
+            if missing:
+                print(f"Batch answer left out {len(missing)} of {len(images)} frames; describing them one by one")
+            # A failed retry only fails its own frame
+            retried = await asyncio.gather(
+                *(self._describe_one(images[i]) for i in missing), return_exceptions=True
+            )
+            results = [(description, True) for description in descriptions]
+            for i, result in zip(missing, retried):
+                results[i] = result
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _flush(self):
+        """Send the frames waiting in the current batch"""
+        if self._batch_timer is not None:
+            self._batch_timer.cancel()
+            self._batch_timer = None
+        batch, self._batch = self._batch, []
+        if batch:
+            task = self._loop.create_task(self._describe_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    def _enqueue(self, image: dict) -> asyncio.Future:
+        """Add an image to the current batch; the future resolves like _describe_one"""
+        future = self._loop.create_future()
+        self._batch.append((image, future))
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+        elif self._batch_timer is None:
+            self._batch_timer = self._loop.call_later(self.batch_wait, self._flush)
+        return future
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        try:
+            return self.cache.get(key)
+        except sqlite3.Error as e:
+            print(f"Warning: description cache lookup failed: {str(e)}")
+            return None
+
+    def _cache_put(self, key: str, description: str):
+        try:
+            self.cache.put(key, description)
+        except sqlite3.Error as e:
+            print(f"Warning: could not store description in cache: {str(e)}")
+
+    async def describe(self, frame) -> str:
+        """Describe a single frame, from the cache or as part of a batch"""
+        image_hash, image = await asyncio.to_thread(_prepare_frame, frame)
+        key = None
+        if self.cache is not None:
+            key = DescriptionCache.key(image_hash, MODEL_NAME, PROMPT_VERSION)
+            cached = await asyncio.to_thread(self._cache_get, key)
+            if cached is not None:
+                self.cache_hits += 1
+                return cached
+        try:
+            if self.batch_size > 1:
+                description, cacheable = await self._enqueue(image)
+            else:
+                description, cacheable = await self._describe_one(image)
+        except Exception as e:
+            print(f"Error processing frame: {e}")
+            self.failures += 1
+            return f"Error: {str(e)}"
+        if key is not None and cacheable:
+            await asyncio.to_thread(self._cache_put, key, description)
+        return description
+
+    def submit(self, frame) -> Future:
+        """
+        Schedule a description from a non-loop thread (e.g. the OCR loop)
+
+        Returns:
+            concurrent.futures.Future resolving to the description string
+        """
+        self._pending.acquire()
+        future = asyncio.run_coroutine_threadsafe(self.describe(frame), self._loop)
+        future.add_done_callback(lambda _: self._pending.release())
+        return future
+
+
 def test_api_connection():
     """
     Test function to verify API key and list available models
     """
     try:
         print("Testing API connection...")
-        models = genai.list_models()
+        models = get_genai().list_models()
         print("\nAvailable Gemini models:")
         for model in models:
             if 'gemini' in model.name.lower() and 'generateContent' in model.supported_generation_methods:
@@ -0,0 +1,80 @@
+"""
+Optional debug artifacts (selected frame dumps) written off the hot path
+
+Frames are handed to a background thread that encodes and writes them, so
+OCR never waits on disk I/O. When the writer falls behind, frames are
+dropped rather than queued without bound.
+"""
+
+import os
+import queue
+import threading
+from typing import Optional
+
+import cv2
+import numpy as np
+
+# Default location for artifacts of extractions that are not part of a job
+ARTIFACTS_ROOT = "extracted_frames"
+
+_STOP = object()
+
+
+class ArtifactWriter:
+    """
+    Background writer for frame images
+
+    Args:
+        directory: Folder the images are written to; created on first write
+        max_pending: Frames allowed to wait for the writer before new ones
+            are dropped
+        jpeg_quality: JPEG quality for written frames
+    """
+
+    def __init__(self, directory: str, max_pending: int = 32, jpeg_quality: int = 90):
+        self.directory = directory
+        self.jpeg_quality = jpeg_quality
+        self.written = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name="artifact-writer", daemon=True)
+        self._thread.start()
+
+    def save(self, filename: str, image: np.ndarray):
+        """Queue an image for writing; never blocks the caller"""
+        try:
+            self._queue.put_nowait((filename, image))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        os.makedirs(self.directory, exist_ok=True)
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            filename, image = item
+            try:
+                ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+                if ok:
+                    encoded.tofile(os.path.join(self.directory, filename))
+                    self.written += 1
+            except Exception as e:
+                print(f"Warning: could not write artifact {filename}: {str(e)}")
+
+    def close(self):
+        """Write everything still queued and stop the thread"""
+        self._queue.put(_STOP)
+        self._thread.join()
+
+
+def frame_artifact_name(frame_index: int, timestamp_str: str) -> str:
+    """Unique file name for a selected frame"""
+    return f"frame_{frame_index:08d}_at_{timestamp_str.replace(':', '-')}.jpg"
+
+
+def open_artifact_writer(enabled: bool, directory: Optional[str]) -> Optional[ArtifactWriter]:
+    """ArtifactWriter for directory when frame dumps are enabled, else None"""
+    if not enabled or not directory:
+        return None
+    return ArtifactWriter(directory)
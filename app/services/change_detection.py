@@ -0,0 +1,261 @@
+"""
+Frame change detection on cached grayscale (optionally downscaled) frames
+"""
+
+import math
+from collections import deque
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Frame-to-frame diffs needed before the adaptive noise floor replaces the
+# initial threshold
+MIN_NOISE_SAMPLES = 10
+
+# Recent frame-to-frame diffs the adaptive noise floor is estimated from
+NOISE_WINDOW = 120
+
+
+def to_gray_thumbnail(frame: np.ndarray, scale: float = 1.0) -> np.ndarray:
+    """
+    Convert a frame to the grayscale image used for change detection
+
+    Args:
+        frame: Video frame as numpy array
+        scale: Resize factor applied before the color conversion; 1.0 keeps
+            full resolution
+
+    Returns:
+        np.ndarray: Single-channel uint8 image
+    """
+    if scale < 1.0:
+        height, width = frame.shape[:2]
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        frame = cv2.resize(frame, size, interpolation=cv2.INTER_LINEAR)
+    if frame.ndim == 2:
+        # Decoded straight to gray
+        return frame
+    # Same conversion select_frame has always used, so thresholds carry over
+    return cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+
+
+def diff_stats(gray: np.ndarray, prev_gray: np.ndarray) -> Tuple[float, float]:
+    """
+    Mean and standard deviation of the absolute difference of two gray images
+
+    Returns:
+        Tuple of (mean_diff, std_diff)
+    """
+    mean, std = cv2.meanStdDev(cv2.absdiff(gray, prev_gray))
+    return float(mean[0, 0]), float(std[0, 0])
+
+
+def changed_regions(
+    gray: np.ndarray,
+    prev_gray: np.ndarray,
+    pixel_threshold: int = 25,
+    dilate: int = 9
+) -> List[Tuple[int, int, int, int]]:
+    """
+    Bounding boxes of the areas that differ between two gray images
+
+    The absdiff map is thresholded and dilated so the changed pixels of one
+    word or line form a single box.
+
+    Args:
+        gray: Current grayscale frame
+        prev_gray: Previous grayscale frame of the same size
+        pixel_threshold: Minimum per-pixel difference counted as a change
+        dilate: Size of the square kernel joining nearby changed pixels
+
+    Returns:
+        List of (x, y, w, h) boxes; empty when nothing changed
+    """
+    _, mask = cv2.threshold(cv2.absdiff(gray, prev_gray), pixel_threshold, 255, cv2.THRESH_BINARY)
+    if not cv2.countNonZero(mask):
+        return []
+    mask = cv2.dilate(mask, cv2.getStructuringElement(cv2.MORPH_RECT, (dilate, dilate)))
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return [cv2.boundingRect(contour) for contour in contours]
+
+
+class ChangeDetector:
+    """
+    Compare each frame with the previous one without re-converting it
+
+    The grayscale version of the last frame is cached, so every frame is
+    converted once and no full-resolution BGR copy is kept.
+
+    Args:
+        threshold: std_diff above which a frame counts as changed
+        scale: Resize factor for the cached grayscale thumbnail. 1.0 gives
+            the same selections as select_frame; smaller values are much
+            cheaper but average away fine detail.
+    """
+
+    mode = "fixed"
+
+    def __init__(self, threshold: float = 4.0, scale: float = 1.0):
+        self.threshold = threshold
+        self.scale = scale
+        self.selected = 0
+        self.skipped = 0
+        self._prev_gray: Optional[np.ndarray] = None
+
+    def measure(self, frame: np.ndarray) -> Optional[Tuple[float, float]]:
+        """
+        Diff statistics of frame against the previous frame
+
+        Returns:
+            Tuple of (mean_diff, std_diff), or None for the first frame
+        """
+        gray = to_gray_thumbnail(frame, self.scale)
+        prev_gray, self._prev_gray = self._prev_gray, gray
+        if prev_gray is None:
+            return None
+        return diff_stats(gray, prev_gray)
+
+    def is_change(self, frame: np.ndarray) -> bool:
+        """True when frame differs enough from the previous frame"""
+        stats = self.measure(frame)
+        changed = stats is not None and stats[1] > self.threshold
+        if changed:
+            self.selected += 1
+        else:
+            self.skipped += 1
+        return changed
+
+    def finish(self) -> bool:
+        """True when the last frame passed to is_change should still be selected"""
+        return False
+
+    def reset_counts(self):
+        """Forget the selections counted so far, e.g. those of a segment's warm-up"""
+        self.selected = 0
+        self.skipped = 0
+
+    def stats(self) -> dict:
+        """Selection counters reported with the result"""
+        return {"mode": self.mode, "selected": self.selected, "skipped": self.skipped,
+                "threshold": self.threshold}
+
+
+def settle_samples_for(settle_seconds: Optional[float], fps: float, frame_step: int) -> int:
+    """Samples a change must stay stable for, from settle_seconds"""
+    return math.ceil((settle_seconds or 0) * (fps or 0) / max(1, frame_step))
+
+
+class AdaptiveChangeDetector(ChangeDetector):
+    """
+    Select one settled frame per slide, with a threshold fitted to the video
+
+    The noise floor is a high percentile of the recent std_diffs between
+    consecutive frames, and the threshold is a multiple of it, so sensor
+    noise, compression artifacts (e.g. keyframe pulses) and steady speaker
+    motion raise it while clean screencasts keep it low. Diffs above
+    max_threshold are left out of the estimate: the threshold can never
+    reach them, so they are slide changes, crossfades or heavy motion, and
+    counting them would pin the threshold at max_threshold on videos whose
+    slides change often. A frame that
+    differs from the last selected frame starts a change, and the change is
+    only selected once the picture has stayed within the threshold of one
+    frame for settle_samples samples: transitions, animations and scrolling
+    yield their final frame rather than every step, and a change that
+    settles back to the selected picture is skipped.
+
+    Args:
+        scale: Resize factor for the grayscale thumbnails
+        settle_samples: Consecutive stable samples required before a
+            change is selected
+        window: Number of recent frame-to-frame diffs (at most
+            max_threshold) the noise floor is estimated from
+        noise_percentile: Percentile of those diffs taken as the noise floor
+        sensitivity: Multiple of the noise floor a diff must exceed to count
+            as a change
+        min_threshold: Lower bound of the threshold
+        max_threshold: Upper bound of the threshold, so long stretches of
+            motion do not hide the next slide change
+        initial_threshold: Threshold used until a few diffs have been seen
+    """
+
+    mode = "adaptive"
+
+    def __init__(
+        self,
+        scale: float = 1.0,
+        settle_samples: int = 5,
+        window: int = NOISE_WINDOW,
+        noise_percentile: float = 90.0,
+        sensitivity: float = 2.0,
+        min_threshold: float = 1.0,
+        max_threshold: float = 8.0,
+        initial_threshold: float = 4.0
+    ):
+        super().__init__(initial_threshold, scale)
+        self.settle_samples = max(1, int(settle_samples))
+        self.noise_percentile = noise_percentile
+        self.sensitivity = sensitivity
+        self.min_threshold = min_threshold
+        self.max_threshold = max_threshold
+        self.noise_floor = 0.0
+        self._diffs = deque(maxlen=window)
+        self._reference: Optional[np.ndarray] = None  # last selected frame
+        self._anchor: Optional[np.ndarray] = None  # first frame of the current stable run
+        self._pending = True  # the opening frame counts as a change
+        self._stable = 0
+
+    def _update_threshold(self, diff: float):
+        if diff > self.max_threshold:
+            return
+        self._diffs.append(diff)
+        if len(self._diffs) < min(MIN_NOISE_SAMPLES, self._diffs.maxlen):
+            return
+        self.noise_floor = float(np.percentile(self._diffs, self.noise_percentile))
+        self.threshold = min(self.max_threshold,
+                             max(self.min_threshold, self.sensitivity * self.noise_floor))
+
+    def _differs(self, gray: np.ndarray, other: Optional[np.ndarray]) -> bool:
+        return other is None or diff_stats(gray, other)[1] > self.threshold
+
+    def is_change(self, frame: np.ndarray) -> bool:
+        """True when frame is the settled frame of a new slide"""
+        gray = to_gray_thumbnail(frame, self.scale)
+        if self._prev_gray is not None:
+            self._update_threshold(diff_stats(gray, self._prev_gray)[1])
+        self._prev_gray = gray
+
+        # Compared with the start of the run, not the previous frame, so
+        # slow scrolling or fades do not count as stable
+        if self._differs(gray, self._anchor):
+            self._anchor = gray
+            self._stable = 0
+        else:
+            self._stable += 1
+
+        if not self._pending and self._differs(gray, self._reference):
+            self._pending = True
+
+        if self._pending and self._stable >= self.settle_samples:
+            self._pending = False
+            if self._differs(gray, self._reference):
+                self._reference = gray
+                self.selected += 1
+                return True
+
+        self.skipped += 1
+        return False
+
+    def finish(self) -> bool:
+        """Select the last frame when a change was still settling at the end"""
+        if self._pending and self._prev_gray is not None and self._differs(self._prev_gray, self._reference):
+            self._pending = False
+            self._reference = self._prev_gray
+            self.skipped -= 1
+            self.selected += 1
+            return True
+        return False
+
+    def stats(self) -> dict:
+        return {**super().stats(), "noise_floor": round(self.noise_floor, 3),
+                "threshold": round(self.threshold, 3)}
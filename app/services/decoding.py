@@ -0,0 +1,236 @@
+"""
+Video decoding backends
+
+"opencv" opens files with cv2.VideoCapture's default settings. "ffmpeg"
+forces OpenCV's FFmpeg backend and asks it for hardware-accelerated
+decoding when a device is available and for an explicit number of decoder
+threads. "pyav" decodes with PyAV (optional dependency) using frame and
+slice threading, and has swscale convert each picture from YUV straight to
+grayscale and/or a reduced size, so full-resolution BGR frames are never
+built only to be converted to gray right after.
+
+Every backend returns an object with the part of the cv2.VideoCapture
+interface the pipeline uses (read, grab, get, set, isOpened, release), so
+iter_sampled_frames and the stages after it work unchanged. Skipped frames
+are still only grabbed: decoded, but never converted.
+"""
+
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+DECODE_BACKENDS = ("opencv", "ffmpeg", "pyav")
+
+
+def decoded_size(width: int, height: int, max_height: Optional[int]) -> Tuple[int, int]:
+    """
+    Output size of a frame limited to max_height, keeping the aspect ratio
+
+    Returns:
+        Tuple of (width, height); unchanged when no limit applies
+    """
+    if not max_height or max_height <= 0 or height <= max_height:
+        return width, height
+    return max(2, int(round(width * max_height / height / 2)) * 2), int(max_height)
+
+
+class ConvertedCapture:
+    """
+    OpenCV capture whose frames are converted to gray and/or downscaled as
+    they are read
+
+    Args:
+        cap: Opened cv2.VideoCapture
+        gray: Return single-channel frames
+        max_height: Downscale frames taller than this
+    """
+
+    def __init__(self, cap, gray: bool = False, max_height: Optional[int] = None):
+        self._cap = cap
+        self.gray = gray
+        self.max_height = max_height
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        ok, frame = self._cap.read()
+        if not ok:
+            return ok, frame
+        # Convert first so the resize works on one channel instead of three
+        if self.gray:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        height, width = frame.shape[:2]
+        size = decoded_size(width, height, self.max_height)
+        if size != (width, height):
+            # INTER_AREA is several times slower at non-integer ratios
+            frame = cv2.resize(frame, size, interpolation=cv2.INTER_LINEAR)
+        return True, frame
+
+    def grab(self) -> bool:
+        return self._cap.grab()
+
+    def get(self, prop: int) -> float:
+        return self._cap.get(prop)
+
+    def set(self, prop: int, value: float) -> bool:
+        return self._cap.set(prop, value)
+
+    def isOpened(self) -> bool:
+        return self._cap.isOpened()
+
+    def release(self):
+        self._cap.release()
+
+
+def _load_av():
+    # Imported on first use; PyAV is optional and slow to import
+    try:
+        import av
+    except ImportError:
+        raise RuntimeError("decode_backend='pyav' needs PyAV; install it with `pip install av`")
+    return av
+
+
+class PyAVCapture:
+    """
+    PyAV decoder with the cv2.VideoCapture methods the pipeline uses
+
+    Args:
+        path: Video file
+        gray: Return single-channel frames (the decoded luma plane)
+        max_height: Downscale frames taller than this while converting
+        threads: Decoder threads; 0 lets FFmpeg pick one per CPU
+    """
+
+    def __init__(self, path: str, gray: bool = False, max_height: Optional[int] = None, threads: int = 0):
+        av = _load_av()
+        self._container = None
+        self._position = 0
+        self._pending = None
+        try:
+            self._container = av.open(path)
+            self._stream = self._container.streams.video[0]
+        except (av.FFmpegError, IndexError) as e:
+            print(f"PyAV could not open {path}: {str(e)}")
+            self.release()
+            return
+        self._stream.thread_type = "AUTO"
+        if threads and threads > 0:
+            self._stream.codec_context.thread_count = threads
+        rate = self._stream.average_rate or self._stream.guessed_rate
+        self.fps = float(rate) if rate else 0.0
+        self.frame_count = self._stream.frames
+        if not self.frame_count and self.fps and self._container.duration:
+            self.frame_count = int(self._container.duration / av.time_base * self.fps)
+        self.width, self.height = decoded_size(
+            self._stream.codec_context.width, self._stream.codec_context.height, max_height
+        )
+        self._resize = self.height != self._stream.codec_context.height
+        self._format = "gray" if gray else "bgr24"
+        self._frames = self._container.decode(self._stream)
+
+    def _next(self):
+        if self._pending is not None:
+            frame, self._pending = self._pending, None
+        else:
+            frame = next(self._frames, None)
+        if frame is not None:
+            self._position += 1
+        return frame
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        frame = self._next() if self._container is not None else None
+        if frame is None:
+            return False, None
+        if self._resize:
+            image = frame.to_ndarray(
+                format=self._format, width=self.width, height=self.height, interpolation="AREA"
+            )
+        else:
+            image = frame.to_ndarray(format=self._format)
+        return True, image
+
+    def grab(self) -> bool:
+        return self._container is not None and self._next() is not None
+
+    def _frame_index(self, frame) -> int:
+        seconds = float((frame.pts - (self._stream.start_time or 0)) * self._stream.time_base)
+        return int(round(seconds * self.fps))
+
+    def set(self, prop: int, value: float) -> bool:
+        """Seek to a frame index (CAP_PROP_POS_FRAMES); other properties are read-only"""
+        if prop != cv2.CAP_PROP_POS_FRAMES or self._container is None or not self.fps:
+            return False
+        target = int(value)
+        offset = int(target / self.fps / self._stream.time_base)
+        # Lands on the keyframe before the target; decode forward from there
+        self._container.seek((self._stream.start_time or 0) + offset, stream=self._stream, backward=True)
+        self._frames = self._container.decode(self._stream)
+        self._pending = None
+        for frame in self._frames:
+            if frame.pts is not None and self._frame_index(frame) >= target:
+                self._pending = frame
+                self._position = target
+                return True
+        return False
+
+    def get(self, prop: int) -> float:
+        if self._container is None:
+            return 0.0
+        values = {
+            cv2.CAP_PROP_FPS: self.fps,
+            cv2.CAP_PROP_FRAME_COUNT: self.frame_count,
+            cv2.CAP_PROP_POS_FRAMES: self._position,
+            cv2.CAP_PROP_FRAME_WIDTH: self.width,
+            cv2.CAP_PROP_FRAME_HEIGHT: self.height,
+        }
+        return float(values.get(prop, 0.0))
+
+    def isOpened(self) -> bool:
+        return self._container is not None
+
+    def release(self):
+        if self._container is not None:
+            self._container.close()
+            self._container = None
+
+
+def open_video(
+    path: str,
+    backend: str = "opencv",
+    gray: bool = False,
+    max_height: Optional[int] = None,
+    threads: int = 0
+):
+    """
+    Open a video file for decoding
+
+    Args:
+        path: Video file
+        backend: "opencv" (default VideoCapture), "ffmpeg" (OpenCV's FFmpeg
+            backend with hardware acceleration and decoder threads) or
+            "pyav"
+        gray: Decode to single-channel frames
+        max_height: Downscale frames taller than this
+        threads: Decoder threads for "ffmpeg" and "pyav"; 0 = one per CPU
+
+    Returns:
+        Capture object; check isOpened() before reading
+
+    Raises:
+        ValueError: For an unknown backend
+        RuntimeError: If backend is "pyav" and PyAV is not installed
+    """
+    if backend == "pyav":
+        return PyAVCapture(path, gray, max_height, threads)
+    if backend == "ffmpeg":
+        open_params = [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+        if threads and threads > 0:
+            open_params += [cv2.CAP_PROP_N_THREADS, int(threads)]
+        cap = cv2.VideoCapture(path, cv2.CAP_FFMPEG, open_params)
+    elif backend == "opencv":
+        cap = cv2.VideoCapture(path)
+    else:
+        raise ValueError(f"Unknown decode backend: {backend}")
+    if gray or max_height:
+        return ConvertedCapture(cap, gray, max_height)
+    return cap
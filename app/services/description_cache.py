@@ -0,0 +1,96 @@
+"""
+Persistent cache of frame descriptions keyed by image content
+
+A frame is keyed on the SHA-256 of the downscaled JPEG sent to Gemini, so a
+description is only reused for exactly the image it was given for, e.g. a
+video processed again with other parameters or the same slide in a
+re-upload. Descriptions are stored per model and prompt in a SQLite
+database under jobs/, shared by the API process and job workers; the least
+recently used entries are evicted past the entry limit.
+"""
+
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+DESCRIPTION_CACHE_PATH = os.environ.get(
+    "DESCRIPTION_CACHE_PATH", os.path.join("jobs", "description_cache.sqlite3")
+)
+DESCRIPTION_CACHE_MAX_ENTRIES = int(os.environ.get("DESCRIPTION_CACHE_MAX_ENTRIES", "100000"))
+
+
+class DescriptionCache:
+    """
+    SQLite-backed description store with LRU eviction
+
+    Args:
+        path: Database file; created on first use
+        max_entries: Descriptions kept before evicting
+    """
+
+    def __init__(self, path: str = DESCRIPTION_CACHE_PATH, max_entries: int = DESCRIPTION_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS descriptions ("
+                " key TEXT PRIMARY KEY,"
+                " description TEXT NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS descriptions_lru ON descriptions (last_access)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def key(image_hash: str, model_name: str, prompt_version: int) -> str:
+        """Cache key of an image content hash for a model and prompt"""
+        return f"{model_name}:{prompt_version}:{image_hash}"
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached description for key, or None, refreshing its LRU position"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT description FROM descriptions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE descriptions SET last_access = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def put(self, key: str, description: str):
+        """Store a description and evict least recently used entries over the limit"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO descriptions (key, description, last_access) VALUES (?, ?, ?)",
+                (key, description, time.time())
+            )
+            excess = conn.execute("SELECT COUNT(*) FROM descriptions").fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM descriptions WHERE key IN"
+                    " (SELECT key FROM descriptions ORDER BY last_access LIMIT ?)",
+                    (excess,)
+                )
+
+
+_default_cache: Optional[DescriptionCache] = None
+
+
+def get_description_cache() -> DescriptionCache:
+    """Return the process-wide cache at DESCRIPTION_CACHE_PATH, creating it on first use"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = DescriptionCache()
+    return _default_cache
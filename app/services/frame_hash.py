@@ -0,0 +1,176 @@
+"""
+Perceptual hashing of video frames so repeated slides can reuse earlier
+OCR text and descriptions instead of being processed again
+
+A hash match only says two frames look alike at 32x32; slides that differ in
+a single character ("y = x + 1" vs "y = x + 2") hash identically. Matches are
+therefore confirmed against a stored grayscale thumbnail of the earlier frame
+before its results are reused.
+"""
+
+import os
+from typing import Any, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Width of the thumbnails compared when confirming a hash match
+MATCH_WIDTH = int(os.getenv("DEDUP_MATCH_WIDTH", "960"))
+# Grey-level difference counted as a changed thumbnail pixel
+MATCH_PIXEL_THRESHOLD = int(os.getenv("DEDUP_MATCH_PIXEL_THRESHOLD", "32"))
+# Side of the blocks changed pixels are counted in
+MATCH_BLOCK_SIZE = 16
+# Most changed pixels any block may hold for the frames to still match;
+# re-encoding noise stays at 0 while a changed glyph leaves several
+MATCH_MAX_CHANGED_PIXELS = int(os.getenv("DEDUP_MATCH_MAX_CHANGED_PIXELS", "1"))
+
+
+def dhash(frame: np.ndarray, hash_size: int = 32, margin: int = 4) -> int:
+    """
+    Compute a difference hash (dHash) of a frame
+
+    Each bit marks whether neighbouring cells of the downscaled frame differ by
+    more than `margin` grey levels. Unlike the classic "left > right" dHash,
+    flat slide backgrounds then hash to stable zeros instead of flipping with
+    sensor noise and compression artifacts.
+
+    Args:
+        frame: BGR or grayscale frame
+        hash_size: Hash grid side; the hash has hash_size ** 2 bits
+        margin: Minimum grey-level difference counted as an edge
+
+    Returns:
+        int: Perceptual hash, comparable with hamming_distance
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    resized = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    resized = resized.astype(np.int16)
+    bits = (np.abs(resized[:, 1:] - resized[:, :-1]) > margin).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two hashes"""
+    return (a ^ b).bit_count()
+
+
+def match_thumbnail(frame: np.ndarray) -> np.ndarray:
+    """
+    Grayscale thumbnail used to confirm hash matches with frames_match
+
+    The frame is downscaled to at most MATCH_WIDTH pixels wide and lightly
+    blurred so compression noise does not register as change.
+
+    Args:
+        frame: BGR or grayscale frame
+
+    Returns:
+        np.ndarray: uint8 grayscale thumbnail
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    height, width = gray.shape
+    if width > MATCH_WIDTH:
+        size = (MATCH_WIDTH, max(1, round(height * MATCH_WIDTH / width)))
+        gray = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+    return cv2.GaussianBlur(gray, (3, 3), 0)
+
+
+def frames_match(a: np.ndarray, b: np.ndarray) -> bool:
+    """
+    Whether two match_thumbnail images show the same content
+
+    Changed pixels are counted per MATCH_BLOCK_SIZE block, so a few glyph
+    strokes changing in one place are not averaged away by a large, otherwise
+    identical slide.
+
+    Args:
+        a: Thumbnail from match_thumbnail
+        b: Thumbnail from match_thumbnail
+
+    Returns:
+        bool: True when no block holds more than MATCH_MAX_CHANGED_PIXELS
+            changed pixels
+    """
+    if a.shape != b.shape:
+        return False
+    changed = cv2.absdiff(a, b) > MATCH_PIXEL_THRESHOLD
+    block = MATCH_BLOCK_SIZE
+    height, width = changed.shape
+    padded = np.zeros((-(-height // block) * block, -(-width // block) * block), dtype=np.uint16)
+    padded[:height, :width] = changed
+    per_block = padded.reshape(padded.shape[0] // block, block, -1, block).sum(axis=(1, 3))
+    return int(per_block.max()) <= MATCH_MAX_CHANGED_PIXELS
+
+
+class FrameHashIndex:
+    """
+    Index of already-processed frames matched by Hamming distance
+
+    Frames added together with the frame image keep a PNG-compressed
+    match_thumbnail, and lookups given a frame only return entries whose
+    thumbnail passes frames_match.
+
+    Args:
+        max_distance: Largest Hamming distance treated as the same frame
+    """
+
+    def __init__(self, max_distance: int = 2):
+        self.max_distance = max_distance
+        self._entries: List[Tuple[int, Any, Optional[bytes]]] = []
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+
+    def lookup(self, frame_hash: int, frame: Optional[np.ndarray] = None) -> Optional[Any]:
+        """
+        Find the value stored for the nearest matching hash
+
+        Args:
+            frame_hash: Hash of the frame from dhash
+            frame: Optional frame image; when given, hash matches are only
+                accepted if the stored thumbnail matches it pixel-wise
+
+        Returns:
+            The stored value, or None when no hash is within max_distance
+        """
+        candidates = []
+        for stored_hash, value, thumbnail in self._entries:
+            distance = hamming_distance(stored_hash, frame_hash)
+            if distance <= self.max_distance:
+                candidates.append((distance, value, thumbnail))
+        candidates.sort(key=lambda candidate: candidate[0])
+
+        best_value = None
+        thumbnail_now = None
+        for _, value, thumbnail in candidates:
+            if frame is not None and thumbnail is not None:
+                if thumbnail_now is None:
+                    thumbnail_now = match_thumbnail(frame)
+                stored = cv2.imdecode(np.frombuffer(thumbnail, np.uint8), cv2.IMREAD_GRAYSCALE)
+                if not frames_match(stored, thumbnail_now):
+                    self.rejected += 1
+                    continue
+            best_value = value
+            break
+        if best_value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return best_value
+
+    def add(self, frame_hash: int, value: Any, frame: Optional[np.ndarray] = None):
+        """
+        Remember a processed frame's hash and associated value
+
+        Args:
+            frame_hash: Hash of the frame from dhash
+            value: Value returned by later matching lookups
+            frame: Optional frame image whose thumbnail confirms later matches
+        """
+        thumbnail = None
+        if frame is not None:
+            thumbnail = cv2.imencode(".png", match_thumbnail(frame))[1].tobytes()
+        self._entries.append((frame_hash, value, thumbnail))
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,88 @@
+"""
+Sparse frame decoding: only the frames that are actually sampled are
+retrieved and converted to BGR
+"""
+
+from typing import Iterator, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Above this many frames between samples, seeking (which lands on the
+# preceding keyframe and decodes forward) is cheaper than grabbing every frame
+SEEK_MIN_STEP = 250
+
+
+def frame_step_for(
+    fps: float,
+    frame_interval: Optional[int] = None,
+    sample_rate: Optional[float] = None
+) -> int:
+    """
+    Work out how many frames to advance between samples
+
+    Args:
+        fps: Frames per second of the video
+        frame_interval: Sample every N frames
+        sample_rate: Samples per second of video; takes precedence over
+            frame_interval when set
+
+    Returns:
+        int: Frame step, at least 1
+    """
+    if sample_rate and sample_rate > 0 and fps and fps > 0:
+        return max(1, int(round(fps / sample_rate)))
+    if frame_interval and frame_interval > 0:
+        return int(frame_interval)
+    return 1
+
+
+def iter_sampled_frames(
+    cap,
+    frame_step: int = 1,
+    start_frame: int = 0,
+    end_frame: Optional[int] = None
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Yield every frame_step-th frame of an opened video, optionally of a range
+
+    Skipped frames are only grab()bed, never retrieve()d, so they are not
+    converted to BGR. For large steps the capture seeks directly to the next
+    sample instead.
+
+    Args:
+        cap: Capture from open_video (or an opened cv2.VideoCapture)
+        frame_step: Frames to advance between samples
+        start_frame: First frame to decode; the capture seeks there first
+        end_frame: Stop before this frame (None = end of the video)
+
+    Yields:
+        Tuple of (frame_index, frame)
+    """
+    frame_step = max(1, int(frame_step))
+    use_seek = frame_step >= SEEK_MIN_STEP
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    frame_index = 0
+    if start_frame > 0:
+        if not cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame):
+            raise ValueError(f"Video does not support seeking to frame {start_frame}")
+        frame_index = start_frame
+
+    while end_frame is None or frame_index < end_frame:
+        hasFrame, image = cap.read()
+        if not hasFrame:
+            break
+        yield frame_index, image
+
+        next_index = frame_index + frame_step
+        if use_seek and (total_frames <= 0 or next_index < total_frames):
+            if cap.set(cv2.CAP_PROP_POS_FRAMES, next_index):
+                frame_index = next_index
+                continue
+            # Container does not support seeking; fall back to grabbing
+            use_seek = False
+
+        for _ in range(frame_step - 1):
+            if not cap.grab():
+                return
+        frame_index = next_index
@@ -0,0 +1,649 @@
+"""
+Persistent job queue and bounded worker scheduler for background extractions
+
+Jobs are stored in a SQLite database under jobs/, so their status survives
+restarts. A fixed pool of long-lived worker processes claims queued jobs in
+priority order; each worker imports the extraction pipeline once and reuses
+it for every job instead of starting a fresh interpreter per upload.
+
+Long videos are split into time segments queued as child jobs, so several
+workers process one video at once; the worker finishing the last segment
+merges the results. Worker hosts sharing the jobs/ directory can pull from
+the same queue with `python -m app.services.job_queue`.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from app.models.schemas import VideoProcessingRequest
+from app.services.LLM_service import MODEL_NAME
+from app.services.metrics import record_job_metrics, record_stage_time
+from app.services.progress import EVENTS_FILENAME, JobEventLog
+from app.services.result_cache import cache_key, has_failed_descriptions, load_cached_result, store_cached_result
+from app.services.result_store import get_result_store
+from app.services.sharding import Segment, merge_segment_results, plan_video_segments
+
+JOBS_ROOT = Path("jobs")
+JOB_DB_PATH = os.environ.get("JOB_DB_PATH", str(JOBS_ROOT / "jobs.sqlite3"))
+
+# WAL needs shared memory; use DELETE when hosts share the database over a
+# network filesystem
+JOB_DB_JOURNAL_MODE = os.environ.get("JOB_DB_JOURNAL_MODE", "WAL")
+
+# Identifies this machine's workers in a queue shared by several hosts
+WORKER_HOST = os.environ.get("WORKER_HOST", socket.gethostname())
+
+# Worker processes running extractions
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+
+# Admission control: queued jobs accepted before uploads are rejected
+MAX_QUEUED_JOBS = int(os.environ.get("MAX_QUEUED_JOBS", "100"))
+
+# Claims of a job whose worker keeps dying before it is failed instead of
+# requeued again, so one video that crashes its worker cannot loop forever
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "3"))
+
+# Seconds an idle worker waits before checking the queue again
+POLL_INTERVAL = 0.5
+
+# Written by older versions; results now live in the result store
+RESULT_FILENAME = "result.json"
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    """Whether a process with this PID exists on this host"""
+    if pid is None:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class QueueFullError(Exception):
+    """Raised when admission control rejects a new job"""
+
+
+class JobQueue:
+    """
+    SQLite-backed job queue shared by the API process and its workers
+
+    Args:
+        path: Database file; created on first use
+    """
+
+    def __init__(self, path: str = JOB_DB_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(f"PRAGMA journal_mode={JOB_DB_JOURNAL_MODE}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY,"
+                " status TEXT NOT NULL,"
+                " priority INTEGER NOT NULL DEFAULT 0,"
+                " video_path TEXT,"
+                " output_dir TEXT NOT NULL,"
+                " params TEXT,"
+                " video_sha256 TEXT,"
+                " error TEXT,"
+                " worker_pid INTEGER,"
+                " created_at REAL NOT NULL,"
+                " started_at REAL,"
+                " finished_at REAL,"
+                " worker_host TEXT,"
+                " parent_id TEXT,"
+                " segment TEXT,"
+                " attempts INTEGER NOT NULL DEFAULT 0)"
+            )
+            # Databases created before sharding lack the newer columns
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column in ("worker_host", "parent_id", "segment"):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} TEXT")
+            if "attempts" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (status, priority, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_parent ON jobs (parent_id)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def enqueue(
+        self,
+        job_id: str,
+        video_path: str,
+        output_dir: str,
+        params: Optional[VideoProcessingRequest] = None,
+        priority: int = 0,
+        video_sha256: Optional[str] = None,
+        max_queued: Optional[int] = MAX_QUEUED_JOBS
+    ):
+        """
+        Add a job to the queue
+
+        Args:
+            priority: Higher values are claimed first
+            max_queued: Reject with QueueFullError when this many jobs are
+                already waiting (None = unbounded)
+        """
+        params_json = (params or VideoProcessingRequest()).model_dump_json()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if max_queued is not None:
+                    queued = conn.execute(
+                        "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND parent_id IS NULL"
+                    ).fetchone()[0]
+                    if queued >= max_queued:
+                        raise QueueFullError(f"Job queue is full ({queued} jobs waiting)")
+                conn.execute(
+                    "INSERT INTO jobs (id, status, priority, video_path, output_dir, params,"
+                    " video_sha256, created_at) VALUES (?, 'queued', ?, ?, ?, ?, ?, ?)",
+                    (job_id, priority, video_path, output_dir, params_json, video_sha256, time.time())
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def record(self, job_id: str, status: str, output_dir: str, video_sha256: Optional[str] = None,
+               error: Optional[str] = None):
+        """Insert a job that is already finished (e.g. served from the result cache)"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO jobs (id, status, output_dir, video_sha256, error,"
+                " created_at, finished_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, status, output_dir, video_sha256, error, now, now)
+            )
+
+    def claim_next(self, worker_pid: int) -> Optional[dict]:
+        """Atomically move the highest-priority queued job to processing and count the attempt"""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued'"
+                    " ORDER BY priority DESC, created_at LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'processing', worker_pid = ?, worker_host = ?,"
+                        " started_at = ?, attempts = attempts + 1 WHERE id = ?",
+                        (worker_pid, WORKER_HOST, time.time(), row["id"])
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return dict(row) if row is not None else None
+
+    def finish(self, job_id: str, status: str, error: Optional[str] = None):
+        """Mark a job completed or failed"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, error, time.time(), job_id)
+            )
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Return a job row as a dict, or None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def requeue_interrupted(
+        self, worker_pids: Optional[List[int]] = None, max_attempts: int = JOB_MAX_ATTEMPTS
+    ) -> Tuple[int, List[dict]]:
+        """
+        Put jobs left in processing by dead workers of this host back in the
+        queue
+
+        Jobs already claimed max_attempts times are failed instead; a failed
+        segment fails its parent as in finish_segment.
+
+        Args:
+            worker_pids: Workers known to have exited; None picks the
+                processing jobs of this host whose worker process is gone
+                (used on startup, so workers of another pool on the same
+                host keep their jobs)
+            max_attempts: Claims after which a job is no longer requeued
+
+        Returns:
+            Tuple of (number of requeued jobs, rows of the jobs failed); a
+            failed segment's row has parent_failed set when it failed the
+            parent
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'processing' AND (worker_host = ? OR worker_host IS NULL)",
+                (WORKER_HOST,)
+            ).fetchall()
+        if worker_pids is None:
+            interrupted = [dict(row) for row in rows if not _process_alive(row["worker_pid"])]
+        else:
+            interrupted = [dict(row) for row in rows if row["worker_pid"] in worker_pids]
+
+        requeued, failed = 0, []
+        for job in interrupted:
+            if job["attempts"] >= max_attempts:
+                error = f"Worker exited while processing the job ({job['attempts']} attempts)"
+                if job["parent_id"]:
+                    job["parent_failed"] = self.finish_segment(job["id"], "failed", error)[2] == "failed"
+                else:
+                    self.finish(job["id"], "failed", error)
+                failed.append(job)
+                continue
+            with self._connect() as conn:
+                cursor = conn.execute(
+                    "UPDATE jobs SET status = 'queued', worker_pid = NULL WHERE id = ? AND status = 'processing'",
+                    (job["id"],)
+                )
+            requeued += cursor.rowcount
+        return requeued, failed
+
+    def split(self, job: dict, segments: List[Segment]):
+        """
+        Queue one child job per segment and park the parent until they finish
+
+        Children inherit the parent's video, parameters and priority and
+        get <output_dir>/segments/<index> as their output folder.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for segment in segments:
+                    conn.execute(
+                        "INSERT INTO jobs (id, status, priority, video_path, output_dir, params,"
+                        " video_sha256, created_at, parent_id, segment)"
+                        " VALUES (?, 'queued', ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (f"{job['id']}-seg{segment.index:03d}", job["priority"], job["video_path"],
+                         os.path.join(job["output_dir"], "segments", f"{segment.index:03d}"),
+                         job["params"], job["video_sha256"], now, job["id"], json.dumps(list(segment)))
+                    )
+                conn.execute("UPDATE jobs SET status = 'waiting' WHERE id = ?", (job["id"],))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def children(self, job_id: str) -> List[dict]:
+        """Segment jobs of a parent, in segment order"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE parent_id = ? ORDER BY id", (job_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def wait_for_segments(self, job_id: str) -> bool:
+        """
+        Park a resumed parent until its segments finish
+
+        Returns:
+            bool: True when every segment is already done, in which case the
+            parent stays in processing and the caller merges it now
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                pending = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE parent_id = ?"
+                    " AND status NOT IN ('completed', 'failed')",
+                    (job_id,)
+                ).fetchone()[0]
+                if pending:
+                    conn.execute("UPDATE jobs SET status = 'waiting' WHERE id = ?", (job_id,))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return pending == 0
+
+    def finish_segment(self, job_id: str, status: str, error: Optional[str] = None):
+        """
+        Mark a segment job completed or failed and update its parent
+
+        A failed segment fails the parent and cancels its queued siblings.
+        When the last segment completes, the parent moves back to processing
+        so the calling worker can merge it.
+
+        Returns:
+            Tuple of (segments_done, segments_total, action) where action is
+            "merge", "failed" (the parent was just failed) or None
+        """
+        action = None
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                    (status, error, time.time(), job_id)
+                )
+                parent_id = conn.execute("SELECT parent_id FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+                parent = conn.execute("SELECT status FROM jobs WHERE id = ?", (parent_id,)).fetchone()
+                counts = dict(conn.execute(
+                    "SELECT status, COUNT(*) FROM jobs WHERE parent_id = ? GROUP BY status", (parent_id,)
+                ).fetchall())
+                if status == "failed" and parent["status"] not in ("completed", "failed"):
+                    conn.execute(
+                        "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                        (f"Segment {job_id} failed: {error}", time.time(), parent_id)
+                    )
+                    conn.execute(
+                        "UPDATE jobs SET status = 'failed', error = 'cancelled', finished_at = ?"
+                        " WHERE parent_id = ? AND status = 'queued'",
+                        (time.time(), parent_id)
+                    )
+                    action = "failed"
+                elif parent["status"] == "waiting" and counts.get("completed", 0) == sum(counts.values()):
+                    conn.execute(
+                        "UPDATE jobs SET status = 'processing', worker_pid = ?, worker_host = ?"
+                        " WHERE id = ?",
+                        (os.getpid(), WORKER_HOST, parent_id)
+                    )
+                    action = "merge"
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return counts.get("completed", 0), sum(counts.values()), action
+
+    def import_job_dirs(self, jobs_root: Path = JOBS_ROOT) -> int:
+        """
+        Register job folders that predate the queue (jobs/<id>/result.json)
+        and copy their results into the result store, so they can be paged
+        and searched like new ones
+
+        Returns:
+            int: Number of jobs added
+        """
+        store = get_result_store()
+        added = 0
+        for result_file in jobs_root.glob(f"*/{RESULT_FILENAME}"):
+            job_id = result_file.parent.name
+            if self.get(job_id) is None:
+                self.record(job_id, "completed", str(result_file.parent))
+                added += 1
+            if store.summary(job_id) is None:
+                try:
+                    store.import_file(job_id, str(result_file))
+                except (OSError, ValueError) as e:
+                    print(f"Warning: could not import {result_file}: {str(e)}")
+        return added
+
+
+def _run_job(queue: JobQueue, job: dict, extract):
+    if job["parent_id"]:
+        _run_segment(queue, job, extract)
+        return
+
+    output_dir = Path(job["output_dir"])
+    params = VideoProcessingRequest.model_validate_json(job["params"] or "{}")
+    # Progress and partial results for /api/stream/<job_id>
+    events_path = output_dir / EVENTS_FILENAME
+
+    if queue.children(job["id"]):
+        # Requeued after its segments were planned: merge once they are done
+        if queue.wait_for_segments(job["id"]):
+            _merge_segments(queue, job, JobEventLog(str(events_path)))
+        return
+
+    if events_path.exists():
+        # left over from an interrupted attempt of this job
+        events_path.unlink()
+    events = JobEventLog(str(events_path))
+    try:
+        segments = plan_video_segments(job["video_path"], params)
+        if len(segments) > 1:
+            # Segments bypass the result cache; the whole job uses it here
+            started = time.time()
+            cached = load_cached_result(_result_key(job, params)) if params.result_cache else None
+            if cached is not None:
+                cached["cache_hit"] = True
+                cached["processing_time"] = round(time.time() - started, 2)
+                _write_result(job["id"], cached)
+                for entry in cached["detailed_extraction"]:
+                    events({"type": "entry", **entry})
+                queue.finish(job["id"], "completed")
+                record_job_metrics("cache_hit", cached["processing_time"])
+                events({"type": "done", "status": "completed", "error": None})
+                return
+            queue.split(job, segments)
+            events({"type": "progress", "segments_done": 0, "segments_total": len(segments), "percent": 0.0})
+            return
+
+        result = asyncio.run(extract(
+            job["video_path"], params, video_sha256=job["video_sha256"], on_event=events,
+            artifact_dir=str(output_dir / "frames")
+        ))
+        _write_result(job["id"], result)
+        queue.finish(job["id"], "completed")
+        events({"type": "done", "status": "completed", "error": None})
+    except Exception as e:
+        queue.finish(job["id"], "failed", str(e))
+        events({"type": "done", "status": "failed", "error": str(e)})
+
+
+def _write_result(job_id: str, result: dict, searchable: bool = True):
+    started = time.perf_counter()
+    get_result_store().save(job_id, result, searchable)
+    record_stage_time("serialization", time.perf_counter() - started)
+
+
+def _result_key(job: dict, params: VideoProcessingRequest) -> str:
+    return cache_key(job["video_sha256"], params, MODEL_NAME)
+
+
+def _segment_events(parent_events: JobEventLog, segment: Segment):
+    """
+    on_event for a segment job: entries go to the parent's event log as they
+    are processed, and progress with the segment's own percent and ETA
+    """
+    def forward(event: dict):
+        if event.get("type") == "progress":
+            end = segment.end_frame or event["total_frames"]
+            percent = eta = None
+            if end:
+                span = max(1, end - segment.start_frame)
+                done = min(max(0, event["frames_decoded"] - segment.start_frame), span)
+                percent = round(100.0 * done / span, 1)
+                if done:
+                    eta = round(event["elapsed_seconds"] / done * (span - done), 1)
+            event = {**event, "segment": segment.index, "percent": percent, "eta_seconds": eta}
+        parent_events(event)
+    return forward
+
+
+def _run_segment(queue: JobQueue, job: dict, extract):
+    """Process one time segment of a sharded job"""
+    params = VideoProcessingRequest.model_validate_json(job["params"] or "{}")
+    segment = Segment(*json.loads(job["segment"]))
+    parent = queue.get(job["parent_id"])
+    parent_events = JobEventLog(str(Path(parent["output_dir"]) / EVENTS_FILENAME))
+    try:
+        result = asyncio.run(extract(
+            job["video_path"], params, video_sha256=job["video_sha256"],
+            on_event=_segment_events(parent_events, segment),
+            artifact_dir=str(Path(parent["output_dir"]) / "frames"), segment=segment
+        ))
+        _write_result(job["id"], result, searchable=False)
+        done, total, action = queue.finish_segment(job["id"], "completed")
+    except Exception as e:
+        done, total, action = queue.finish_segment(job["id"], "failed", str(e))
+
+    if action == "failed":
+        parent = queue.get(job["parent_id"])
+        # Segments are recorded apart from jobs; the job fails once
+        elapsed = (parent["finished_at"] or time.time()) - (parent["started_at"] or time.time())
+        record_job_metrics("failed", round(elapsed, 2))
+        parent_events({"type": "done", "status": "failed", "error": parent["error"]})
+    elif action == "merge":
+        _merge_segments(queue, queue.get(job["parent_id"]), parent_events)
+    else:
+        parent_events({
+            "type": "progress", "segments_done": done, "segments_total": total,
+            "percent": round(100.0 * done / total, 1),
+        })
+
+
+def _merge_segments(queue: JobQueue, job: dict, events: JobEventLog):
+    """
+    Combine the results of a sharded job's segments into the job's result
+
+    The entries were already streamed by the segments; the merged result is
+    stored in the result cache like a linear run's.
+    """
+    try:
+        store = get_result_store()
+        children = queue.children(job["id"])
+        results = [store.load(child["id"]) for child in children]
+        if any(result is None for result in results):
+            raise Exception("Missing segment result")
+        elapsed = max(c["finished_at"] for c in children) - min(c["started_at"] for c in children)
+        params = VideoProcessingRequest.model_validate_json(job["params"] or "{}")
+        result = merge_segment_results(
+            results, elapsed, params.consolidate_similarity if params.consolidate else None
+        )
+        _write_result(job["id"], result)
+        store.delete([child["id"] for child in children])
+        if (params.result_cache and not result["metrics"]["counters"].get("frames_failed")
+                and not has_failed_descriptions(result)):
+            store_cached_result(_result_key(job, params), result)
+        queue.finish(job["id"], "completed")
+        record_job_metrics("completed", result["processing_time"])
+        events({"type": "done", "status": "completed", "error": None})
+    except Exception as e:
+        queue.finish(job["id"], "failed", str(e))
+        record_job_metrics("failed", round(time.time() - (job["started_at"] or time.time()), 2))
+        events({"type": "done", "status": "failed", "error": str(e)})
+
+
+def _worker_main(db_path: str, stop_event):
+    """Entry point of a worker process: claim and run jobs until stopped"""
+    # Imported once per worker; every job reuses the loaded pipeline
+    from app.services.video_service import text_extractor_from_path
+
+    queue = JobQueue(db_path)
+    pid = os.getpid()
+    while not stop_event.is_set():
+        job = queue.claim_next(pid)
+        if job is None:
+            stop_event.wait(POLL_INTERVAL)
+            continue
+        _run_job(queue, job, text_extractor_from_path)
+
+
+class WorkerPool:
+    """
+    Fixed pool of long-lived extraction worker processes
+
+    A supervisor thread restarts workers that die and requeues the job they
+    were running, up to JOB_MAX_ATTEMPTS claims per job.
+
+    Args:
+        db_path: Job database shared with the workers
+        workers: Number of worker processes
+    """
+
+    def __init__(self, db_path: str = JOB_DB_PATH, workers: int = JOB_WORKERS):
+        self.db_path = db_path
+        self.workers = max(1, workers)
+        self._context = multiprocessing.get_context("spawn")
+        self._stop = self._context.Event()
+        self._processes = []
+        self._supervisor: Optional[threading.Thread] = None
+
+    def _spawn(self):
+        process = self._context.Process(
+            target=_worker_main, args=(self.db_path, self._stop), daemon=True, name="extraction-worker"
+        )
+        process.start()
+        return process
+
+    def start(self):
+        """Recover state from disk and start the workers"""
+        queue = JobQueue(self.db_path)
+        queue.import_job_dirs()
+        self._recover(queue)
+        self._processes = [self._spawn() for _ in range(self.workers)]
+        self._supervisor = threading.Thread(target=self._supervise, name="worker-supervisor", daemon=True)
+        self._supervisor.start()
+
+    def _supervise(self):
+        queue = JobQueue(self.db_path)
+        while not self._stop.wait(1.0):
+            for i, process in enumerate(self._processes):
+                if process.is_alive():
+                    continue
+                print(f"Extraction worker {process.pid} exited ({process.exitcode}); restarting")
+                self._recover(queue, [process.pid])
+                self._processes[i] = self._spawn()
+
+    @staticmethod
+    def _recover(queue: JobQueue, worker_pids: Optional[List[int]] = None):
+        """Requeue the jobs of dead workers, failing those out of attempts"""
+        requeued, failed = queue.requeue_interrupted(worker_pids)
+        if requeued:
+            print(f"Requeued {requeued} interrupted job(s)")
+        for job in failed:
+            print(f"Job {job['id']} failed after {job['attempts']} interrupted attempt(s)")
+            if job["parent_id"]:
+                record_job_metrics("failed", segment=True)
+                job = queue.get(job["parent_id"]) if job["parent_failed"] else None
+            if job is not None:
+                elapsed = (job["finished_at"] or time.time()) - (job["started_at"] or time.time())
+                record_job_metrics("failed", round(elapsed, 2))
+
+    def stop(self, timeout: float = 10.0):
+        """Ask workers to finish their current job and exit"""
+        self._stop.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+
+
+def main():
+    """Run a standalone worker pool, e.g. on another host sharing jobs/"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Process queued extraction jobs")
+    parser.add_argument("--workers", type=int, default=JOB_WORKERS, help="Worker processes")
+    parser.add_argument("--db", default=JOB_DB_PATH, help="Job database shared with the API")
+    args = parser.parse_args()
+
+    pool = WorkerPool(args.db, args.workers)
+    pool.start()
+    print(f"{pool.workers} extraction worker(s) on {WORKER_HOST} polling {args.db}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pool.stop()
+
+
+if __name__ == "__main__":
+    main()
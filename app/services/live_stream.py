@@ -0,0 +1,387 @@
+"""
+Live extraction from RTSP/RTMP/HLS streams
+
+A reader thread drains the stream as fast as it arrives and keeps only the
+newest sampled frame; the frame selection, dedup, OCR and description stages
+pull from it at their own pace. When they fall behind, older frames are
+dropped rather than queued, so the delay between a slide appearing and its
+entry being emitted stays around one OCR pass plus the description request.
+
+Local video files are replayed at their native frame rate, which stands in
+for a live source when testing (or serve one with ffmpeg, e.g.
+``ffmpeg -re -stream_loop -1 -i talk.mp4 -f rtsp rtsp://localhost:8554/talk``
+with an RTSP server such as mediamtx).
+"""
+
+import argparse
+import asyncio
+import ipaddress
+import json
+import os
+import socket
+import threading
+import time
+from typing import AsyncIterator, Iterator, Optional, Tuple
+from urllib.parse import urlparse
+
+import cv2
+import numpy as np
+
+from app.models.schemas import VideoProcessingRequest
+from app.services.description_cache import get_description_cache
+from app.services.frame_hash import FrameHashIndex
+from app.services.frame_source import frame_step_for
+from app.services.LLM_service import DescriptionStage
+from app.services.metrics import PipelineMetrics, record_job_metrics
+from app.services.video_service import (
+    finish_ocr_timing, iter_ocr_results, iter_unique_frames, make_change_detector, new_ocr_timing,
+    no_description, select_changed_frames
+)
+
+STREAM_SCHEMES = ("rtsp", "rtsps", "rtmp", "rtmps", "http", "https", "srt", "udp")
+
+# Streams the API may open on a caller's behalf: schemes, and optionally
+# hosts ("cams.example.com", or ".example.com" for its subdomains). Without
+# a host list, hosts resolving to private, loopback, link-local or other
+# non-public addresses are refused.
+LIVE_ALLOWED_SCHEMES = tuple(
+    scheme.strip().lower()
+    for scheme in os.environ.get("LIVE_ALLOWED_SCHEMES", "rtsp,rtsps,rtmp,rtmps,srt,http,https").split(",")
+    if scheme.strip()
+)
+LIVE_ALLOWED_HOSTS = tuple(
+    host.strip().lower() for host in os.environ.get("LIVE_ALLOWED_HOSTS", "").split(",") if host.strip()
+)
+
+# Used when the stream does not report a usable frame rate
+FALLBACK_FPS = 25.0
+
+# Reconnection attempts after a stream stops delivering frames
+RECONNECT_ATTEMPTS = 5
+RECONNECT_DELAY = 2.0
+
+# Seconds between progress events while no entry is emitted
+PROGRESS_INTERVAL = 5.0
+
+
+def is_stream_url(source: str) -> bool:
+    """True for network stream URLs (RTSP, RTMP, HLS over HTTP, ...)"""
+    return urlparse(source).scheme.lower() in STREAM_SCHEMES
+
+
+def check_stream_url(url: str):
+    """
+    Refuse stream URLs the server must not open for an API caller
+
+    FFmpeg connects wherever the URL points, so an unchecked URL would let
+    callers reach internal services or cloud metadata endpoints. FFmpeg
+    also follows HTTP redirects and HLS playlist entries, which this check
+    cannot see; set LIVE_ALLOWED_HOSTS when callers are not trusted.
+
+    Raises:
+        ValueError: If the scheme or host is not allowed
+    """
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    if scheme not in LIVE_ALLOWED_SCHEMES:
+        raise ValueError(f"url must be one of: {', '.join(LIVE_ALLOWED_SCHEMES)}")
+    host = (parsed.hostname or "").lower()
+    if not host:
+        raise ValueError("url has no host")
+    if LIVE_ALLOWED_HOSTS:
+        if not any(host == allowed or (allowed.startswith(".") and host.endswith(allowed))
+                   for allowed in LIVE_ALLOWED_HOSTS):
+            raise ValueError(f"Streams from {host} are not allowed")
+        return
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, parsed.port or 0)}
+    except socket.gaierror:
+        raise ValueError(f"Could not resolve {host}")
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split("%")[0])
+        if not ip.is_global or ip.is_multicast:
+            raise ValueError(f"Streams from non-public address {ip} are not allowed")
+
+
+def open_capture(source: str):
+    """
+    Open a stream URL or video file
+
+    Raises:
+        ValueError: If the source cannot be opened
+    """
+    cap = cv2.VideoCapture(source, cv2.CAP_FFMPEG) if is_stream_url(source) else cv2.VideoCapture(source)
+    if not cap.isOpened():
+        cap.release()
+        raise ValueError(f"Could not open stream {source}")
+    # Keep the backend's own buffer short; the reader drains it anyway
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+
+def stream_fps(cap) -> float:
+    """Frame rate reported by the capture, or FALLBACK_FPS if it is implausible"""
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    return fps if 0 < fps <= 240 else FALLBACK_FPS
+
+
+class LatestFrameReader:
+    """
+    Read a live capture on a background thread, keeping only the newest frame
+
+    Every frame_step-th frame is offered to the consumer; one the consumer
+    has not taken by the time the next one arrives is dropped.
+
+    Args:
+        source: Stream URL or video file
+        cap: Capture opened on source
+        fps: Frame rate, for pacing files and numbering frames
+        frame_step: Frames between offered samples
+        realtime: Pace reading at fps (for files standing in for a stream)
+        stop: Event that ends reading when set
+    """
+
+    def __init__(self, source: str, cap, fps: float, frame_step: int = 1, realtime: bool = False,
+                 stop: Optional[threading.Event] = None):
+        self.source = source
+        self.fps = fps
+        self.frame_step = max(1, int(frame_step))
+        self.realtime = realtime
+        self.stop = stop or threading.Event()
+        self.frames_read = 0
+        self.dropped = 0
+        self.error: Optional[Exception] = None
+        self._cap = cap
+        self._latest: Optional[Tuple[int, np.ndarray, float]] = None
+        self._ended = False
+        self._last_yielded: Tuple[int, float] = (-1, 0.0)
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._read, name="live-reader", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _reconnect(self, read_since_open: int) -> bool:
+        if not is_stream_url(self.source):
+            return False
+        # A playlist or file with a known length that was read to the end
+        # has finished; only live streams (no frame count) are reopened
+        total_frames = self._cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        if total_frames > 0 and read_since_open >= total_frames - 1:
+            return False
+        for attempt in range(1, RECONNECT_ATTEMPTS + 1):
+            if self.stop.wait(RECONNECT_DELAY):
+                return False
+            print(f"Stream {self.source} stalled; reconnecting ({attempt}/{RECONNECT_ATTEMPTS})")
+            self._cap.release()
+            try:
+                self._cap = open_capture(self.source)
+                return True
+            except ValueError:
+                continue
+        return False
+
+    def _read(self):
+        started = time.monotonic()
+        read_since_open = 0
+        try:
+            while not self.stop.is_set():
+                ok, frame = self._cap.read()
+                if not ok:
+                    if self._reconnect(read_since_open):
+                        read_since_open = 0
+                        continue
+                    break
+                index = self.frames_read
+                self.frames_read += 1
+                read_since_open += 1
+                if self.realtime:
+                    delay = started + index / self.fps - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                if index % self.frame_step:
+                    continue
+                with self._condition:
+                    if self._latest is not None:
+                        self.dropped += 1
+                    self._latest = (index, frame, time.monotonic())
+                    self._condition.notify()
+        except Exception as e:
+            self.error = e
+        finally:
+            self._cap.release()
+            with self._condition:
+                self._ended = True
+                self._condition.notify()
+
+    def __iter__(self) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield (frame_index, frame) for each sample taken before it was replaced"""
+        while True:
+            with self._condition:
+                while self._latest is None and not self._ended:
+                    self._condition.wait()
+                if self._latest is None:
+                    break
+                index, frame, captured_at = self._latest
+                self._latest = None
+                self._last_yielded = (index, captured_at)
+            yield index, frame
+        if self.error is not None:
+            raise self.error
+
+    def captured_at(self, frame_index: int) -> Optional[float]:
+        """
+        time.monotonic() at which frame_index was read, if it is the frame
+        yielded last (the stages pull one frame at a time, so a result
+        always belongs to it)
+        """
+        index, captured_at = self._last_yielded
+        return captured_at if index == frame_index else None
+
+    def close(self):
+        self.stop.set()
+        self._thread.join()
+
+
+async def run_live_extraction(
+    source: str,
+    params: Optional[VideoProcessingRequest] = None,
+    description_stage: Optional[DescriptionStage] = None,
+    max_seconds: Optional[float] = None,
+    realtime: Optional[bool] = None
+) -> AsyncIterator[dict]:
+    """
+    Extract text from a live stream, yielding events as they happen
+
+    Runs the same frame selection, dedup, OCR and description stages as a
+    file extraction. OCR stays inline (ocr_workers is ignored) so at most
+    one selected frame waits for it; frames that arrive meanwhile are
+    dropped. Closing the generator stops the stream.
+
+    Args:
+        source: RTSP/RTMP/HLS URL, or a video file replayed as a stream
+        params: Processing parameters
+        description_stage: Optional preconfigured DescriptionStage, e.g. one
+            wrapping a fake client
+        max_seconds: Stop after this much wall time (None = until the
+            stream ends)
+        realtime: Pace reading at the stream's frame rate; defaults to True
+            for files and False for URLs
+
+    Yields:
+        Event dicts: "entry" (time_stamp, text, image_description,
+        latency_ms) per new frame, "progress" with frame counters at least
+        every PROGRESS_INTERVAL seconds, and a final "done"
+    """
+    params = params or VideoProcessingRequest()
+    realtime = not is_stream_url(source) if realtime is None else realtime
+    metrics = PipelineMetrics()
+    started = time.time()
+    status = "live_completed"
+
+    stage = None
+    if params.image_descriptions:
+        stage = description_stage or DescriptionStage(
+            concurrency=params.llm_concurrency,
+            rate_limit=params.llm_rate_limit,
+            max_retries=params.llm_max_retries,
+            batch_size=params.llm_batch_size,
+            cache=get_description_cache() if params.description_cache else None,
+        )
+    describe = stage.submit if stage is not None else no_description
+
+    cap = await asyncio.to_thread(open_capture, source)
+    fps = stream_fps(cap)
+    frame_step = frame_step_for(fps, sample_rate=params.sample_rate)
+    reader = LatestFrameReader(source, cap, fps, frame_step, realtime).start()
+    timer = threading.Timer(max_seconds, reader.stop.set) if max_seconds else None
+    if timer is not None:
+        timer.start()
+
+    loop = asyncio.get_running_loop()
+    results: asyncio.Queue = asyncio.Queue()
+    end = object()
+    ocr_timing = new_ocr_timing(params)
+
+    def extract():
+        try:
+            frames = select_changed_frames(
+                reader, fps, make_change_detector(params, fps, frame_step), metrics=metrics, at_end=False
+            )
+            if params.dedup_enabled:
+                frames = iter_unique_frames(frames, FrameHashIndex(max_distance=params.dedup_max_distance), metrics)
+            for result in iter_ocr_results(frames, params, describe, ocr_timing, workers=0):
+                loop.call_soon_threadsafe(results.put_nowait, (result, reader.captured_at(result[0])))
+        except Exception as e:
+            loop.call_soon_threadsafe(results.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(results.put_nowait, end)
+
+    def progress_event() -> dict:
+        return {
+            "type": "progress",
+            **metrics.as_dict()["counters"],
+            "frames_read": reader.frames_read,
+            "frames_dropped": reader.dropped,
+            "elapsed_seconds": round(time.time() - started, 1),
+        }
+
+    worker = loop.run_in_executor(None, extract)
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(results.get(), PROGRESS_INTERVAL)
+            except asyncio.TimeoutError:
+                yield progress_event()
+                continue
+            if item is end:
+                break
+            if isinstance(item, Exception):
+                raise item
+            (frame_index, timestamp_str, extracted_text, description), captured_at = item
+            image_description = await asyncio.wrap_future(description) if description is not None else None
+            yield {
+                "type": "entry",
+                "time_stamp": timestamp_str,
+                "text": extracted_text,
+                "image_description": image_description,
+                "latency_ms": round((time.monotonic() - captured_at) * 1000) if captured_at else None,
+            }
+        yield {**progress_event(), "type": "done", "status": "completed", "error": None}
+    except Exception:
+        status = "live_failed"
+        raise
+    finally:
+        if timer is not None:
+            timer.cancel()
+        reader.stop.set()
+        await worker
+        await asyncio.to_thread(reader.close)
+        finish_ocr_timing(ocr_timing, metrics)
+        metrics.count("frames_dropped", reader.dropped)
+        await asyncio.to_thread(record_job_metrics, status, round(time.time() - started, 2), metrics)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract on-screen text from a live stream as JSON lines")
+    parser.add_argument("source", help="RTSP/RTMP/HLS URL, or a video file replayed in real time")
+    parser.add_argument("--max-seconds", type=float, default=None, help="Stop after this many seconds")
+    parser.add_argument("--sample-rate", type=float, default=None, help="Frames sampled per second")
+    parser.add_argument("--ocr-mode", default="fast", choices=["accurate", "fast", "incremental"])
+    parser.add_argument("--ocr-only", action="store_true", help="Skip Gemini image descriptions")
+    args = parser.parse_args()
+
+    params = VideoProcessingRequest(
+        ocr_mode=args.ocr_mode, sample_rate=args.sample_rate, image_descriptions=not args.ocr_only
+    )
+
+    async def run():
+        async for event in run_live_extraction(args.source, params, max_seconds=args.max_seconds):
+            print(json.dumps(event, ensure_ascii=False), flush=True)
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Per-stage pipeline metrics and their aggregate across jobs
+
+Each extraction fills a PipelineMetrics with the time spent per stage and
+frame counters; the breakdown is returned in the result under "metrics".
+Totals are added to a small SQLite database under jobs/ so the API process
+can serve them at /metrics in the Prometheus text format, including jobs
+run by the background worker processes.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional
+
+METRICS_DB_PATH = os.environ.get("METRICS_DB_PATH", os.path.join("jobs", "metrics.sqlite3"))
+
+# decode, change_detection and dedup are wall time on the decode thread;
+# ocr and llm are summed over workers and concurrent requests, so they can
+# exceed the job's wall time
+STAGES = ("decode", "change_detection", "dedup", "ocr", "llm", "consolidation", "serialization")
+COUNTERS = (
+    "frames_seen", "frames_selected", "frames_deduplicated", "frames_failed", "frames_description_cached",
+    "frames_dropped"
+)
+
+
+class PipelineMetrics:
+    """
+    Stage timings and frame counters of one extraction
+
+    Safe to update from the decode thread and the event loop at once.
+    """
+
+    def __init__(self):
+        self.stages = dict.fromkeys(STAGES, 0.0)
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self._lock = threading.Lock()
+
+    def add_time(self, stage: str, seconds: float):
+        """Add seconds spent in a stage"""
+        with self._lock:
+            self.stages[stage] += seconds
+
+    def count(self, counter: str, n: int = 1):
+        """Increment a frame counter"""
+        with self._lock:
+            self.counters[counter] += n
+
+    @contextmanager
+    def timed(self, stage: str):
+        """Time the enclosed block as part of stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - started)
+
+    def timed_iter(self, stage: str, iterable: Iterable) -> Iterator:
+        """Yield from iterable, timing only the work done producing each item"""
+        iterator = iter(iterable)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_time(stage, time.perf_counter() - started)
+                return
+            self.add_time(stage, time.perf_counter() - started)
+            yield item
+
+    def as_dict(self) -> dict:
+        """Breakdown returned with the result"""
+        with self._lock:
+            return {
+                "stages_ms": {stage: round(seconds * 1000, 1) for stage, seconds in self.stages.items()},
+                "counters": dict(self.counters),
+            }
+
+
+class MetricsStore:
+    """
+    Cumulative counters shared by every process that runs extractions
+
+    Args:
+        path: Database file; created on first use
+    """
+
+    def __init__(self, path: str = METRICS_DB_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS counters ("
+                " name TEXT NOT NULL,"
+                " label TEXT NOT NULL,"
+                " value REAL NOT NULL,"
+                " PRIMARY KEY (name, label))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def add(self, values: dict):
+        """Add {(name, label): amount} to the stored counters in one transaction"""
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO counters (name, label, value) VALUES (?, ?, ?)"
+                " ON CONFLICT (name, label) DO UPDATE SET value = value + excluded.value",
+                [(name, label, amount) for (name, label), amount in values.items()]
+            )
+
+    def totals(self) -> dict:
+        """All counters as {(name, label): value}"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT name, label, value FROM counters").fetchall()
+        return {(name, label): value for name, label, value in rows}
+
+    def record_job(self, status: str, processing_time: float = 0.0,
+                   metrics: Optional[PipelineMetrics] = None, segment: bool = False):
+        """
+        Add one finished extraction (completed, failed or cache_hit)
+
+        A segment of a sharded job (segment=True) is counted under
+        segments_total and its own processing time summary, since the job
+        itself is recorded once when its segments are merged; its stage
+        times and frame counters are added as usual.
+        """
+        if segment:
+            values = {
+                ("segments_total", status): 1,
+                ("segment_seconds_sum", ""): processing_time,
+                ("segment_seconds_count", ""): 1,
+            }
+        else:
+            values = {
+                ("jobs_total", status): 1,
+                ("processing_seconds_sum", ""): processing_time,
+                ("processing_seconds_count", ""): 1,
+            }
+        if metrics is not None:
+            for stage, seconds in metrics.stages.items():
+                values[("stage_seconds_total", stage)] = seconds
+            for counter, n in metrics.counters.items():
+                values[("frames_total", counter[len("frames_"):])] = n
+        self.add(values)
+
+    def render_prometheus(self) -> str:
+        """Counters in the Prometheus text exposition format"""
+        totals = self.totals()
+        families = [
+            ("jobs_total", "status", "counter", "Extractions by final status"),
+            ("segments_total", "status", "counter", "Segments of sharded jobs by final status"),
+            ("stage_seconds_total", "stage", "counter", "Seconds spent per pipeline stage"),
+            ("frames_total", "kind", "counter", "Frames seen, selected, deduplicated, failed, described from cache and dropped (live)"),
+        ]
+        lines = []
+        for name, label_name, kind, help_text in families:
+            metric = f"video_extraction_{name}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for (stored, label), value in sorted(totals.items()):
+                if stored == name:
+                    lines.append(f'{metric}{{{label_name}="{label}"}} {_format_value(value)}')
+
+        summaries = [
+            ("processing_seconds", "End-to-end extraction time"),
+            ("segment_seconds", "Processing time of one segment of a sharded job"),
+        ]
+        for name, help_text in summaries:
+            metric = f"video_extraction_{name}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} summary")
+            lines.append(f"{metric}_sum {_format_value(totals.get((f'{name}_sum', ''), 0.0))}")
+            lines.append(f"{metric}_count {_format_value(totals.get((f'{name}_count', ''), 0.0))}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_value(value: float) -> str:
+    """Sample value as the shortest text that reads back as the same float"""
+    value = float(value)
+    if value.is_integer() and abs(value) < 2 ** 53:
+        return str(int(value))
+    return repr(value)
+
+
+_default_store: Optional[MetricsStore] = None
+
+
+def get_metrics_store() -> MetricsStore:
+    """Return the process-wide store at METRICS_DB_PATH, creating it on first use"""
+    global _default_store
+    if _default_store is None:
+        _default_store = MetricsStore()
+    return _default_store
+
+
+def record_job_metrics(status: str, processing_time: float = 0.0,
+                       metrics: Optional[PipelineMetrics] = None, segment: bool = False):
+    """Add a finished extraction or segment to the aggregate; failures are only logged"""
+    try:
+        get_metrics_store().record_job(status, processing_time, metrics, segment)
+    except sqlite3.Error as e:
+        print(f"Warning: could not record metrics: {str(e)}")
+
+
+def record_stage_time(stage: str, seconds: float):
+    """Add time spent outside an extraction (e.g. writing result.json) to the aggregate"""
+    try:
+        get_metrics_store().add({("stage_seconds_total", stage): seconds})
+    except sqlite3.Error as e:
+        print(f"Warning: could not record metrics: {str(e)}")
@@ -0,0 +1,190 @@
+"""
+Pluggable OCR backends
+
+The pytesseract backend writes a temp image, forks the tesseract binary and
+reloads the language data on every call. The tesserocr backend binds
+libtesseract in-process and keeps one initialised engine per thread, so the
+language model is loaded once per worker and reused across frames. The
+"auto" engine prefers tesserocr when it is installed and can load its
+language data, and falls back to pytesseract otherwise.
+"""
+
+import os
+import threading
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pytesseract
+
+try:
+    import tesserocr
+except ImportError:  # optional dependency
+    tesserocr = None
+
+# Tesseract language(s) used by every backend
+OCR_LANG = os.environ.get("OCR_LANG", "eng")
+
+
+class OCREngine:
+    """Interface shared by the OCR backends"""
+
+    name = "base"
+
+    def image_to_string(self, image: np.ndarray) -> str:
+        """Recognise all text in a grayscale or BGR image"""
+        raise NotImplementedError
+
+    def image_to_data(self, image: np.ndarray) -> Dict[str, List]:
+        """Recognised words with confidences, as {'text': [...], 'conf': [...]}"""
+        raise NotImplementedError
+
+    def image_to_lines(self, image: np.ndarray) -> List[Tuple[Tuple[int, int, int, int], str]]:
+        """
+        Recognised text lines with their (x, y, width, height) boxes, from one
+        pass over the whole image
+
+        Backends without layout output return the whole image as one line.
+        """
+        height, width = image.shape[:2]
+        return [((0, 0, width, height), self.image_to_string(image).strip())]
+
+
+class PytesseractEngine(OCREngine):
+    """Runs the tesseract binary once per call through pytesseract"""
+
+    name = "pytesseract"
+
+    def image_to_string(self, image: np.ndarray) -> str:
+        return pytesseract.image_to_string(image, lang=OCR_LANG)
+
+    def image_to_data(self, image: np.ndarray) -> Dict[str, List]:
+        data = pytesseract.image_to_data(image, lang=OCR_LANG, output_type=pytesseract.Output.DICT)
+        return {"text": data["text"], "conf": data["conf"]}
+
+    def image_to_lines(self, image: np.ndarray) -> List[Tuple[Tuple[int, int, int, int], str]]:
+        data = pytesseract.image_to_data(image, lang=OCR_LANG, output_type=pytesseract.Output.DICT)
+        lines: Dict[Tuple[int, int, int], List[int]] = {}
+        for i, word in enumerate(data["text"]):
+            if word.strip():
+                lines.setdefault((data["block_num"][i], data["par_num"][i], data["line_num"][i]), []).append(i)
+        result = []
+        for words in lines.values():
+            x0 = min(data["left"][i] for i in words)
+            y0 = min(data["top"][i] for i in words)
+            x1 = max(data["left"][i] + data["width"][i] for i in words)
+            y1 = max(data["top"][i] + data["height"][i] for i in words)
+            result.append(((x0, y0, x1 - x0, y1 - y0), " ".join(data["text"][i] for i in words)))
+        return result
+
+
+class TesserocrEngine(OCREngine):
+    """
+    In-process libtesseract engine through tesserocr
+
+    PyTessBaseAPI is not thread-safe, so each thread gets its own instance,
+    initialised on first use and kept for the life of the thread.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self):
+        if tesserocr is None:
+            raise RuntimeError("tesserocr is not installed")
+        self._local = threading.local()
+
+    @staticmethod
+    def create_api():
+        """New PyTessBaseAPI for OCR_LANG; raises RuntimeError when tessdata is missing"""
+        kwargs = {"lang": OCR_LANG}
+        if os.environ.get("TESSDATA_PREFIX"):
+            kwargs["path"] = os.environ["TESSDATA_PREFIX"]
+        return tesserocr.PyTessBaseAPI(**kwargs)
+
+    def _api(self):
+        api = getattr(self._local, "api", None)
+        if api is None:
+            api = self.create_api()
+            self._local.api = api
+        return api
+
+    def _set_image(self, image: np.ndarray):
+        image = np.ascontiguousarray(image)
+        height, width = image.shape[:2]
+        channels = 1 if image.ndim == 2 else image.shape[2]
+        if channels == 3:
+            # libtesseract expects RGB byte order
+            image = np.ascontiguousarray(image[:, :, ::-1])
+        api = self._api()
+        api.SetImageBytes(image.tobytes(), width, height, channels, width * channels)
+        return api
+
+    def image_to_string(self, image: np.ndarray) -> str:
+        return self._set_image(image).GetUTF8Text()
+
+    def image_to_data(self, image: np.ndarray) -> Dict[str, List]:
+        api = self._set_image(image)
+        api.Recognize()
+        words = api.MapWordConfidences()
+        return {"text": [word for word, _ in words], "conf": [conf for _, conf in words]}
+
+    def image_to_lines(self, image: np.ndarray) -> List[Tuple[Tuple[int, int, int, int], str]]:
+        api = self._set_image(image)
+        api.Recognize()
+        lines = []
+        level = tesserocr.RIL.TEXTLINE
+        for line in tesserocr.iterate_level(api.GetIterator(), level):
+            text = (line.GetUTF8Text(level) or "").strip()
+            box = line.BoundingBox(level)
+            if text and box is not None:
+                x0, y0, x1, y1 = box
+                lines.append(((x0, y0, x1 - x0, y1 - y0), text))
+        return lines
+
+
+_engines: Dict[str, OCREngine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_ocr_engine(name: str = "auto") -> OCREngine:
+    """
+    Return this process's shared engine for a backend name
+
+    Args:
+        name: "tesserocr", "pytesseract", or "auto" (tesserocr when
+            installed and able to load its language data, otherwise
+            pytesseract)
+
+    Returns:
+        OCREngine instance, created once per process
+    """
+    with _engines_lock:
+        engine = _engines.get(name)
+        if engine is None:
+            if name == "auto":
+                resolved = _resolve_auto()
+                engine = _engines.get(resolved) or _create_engine(resolved)
+                _engines[resolved] = engine
+            else:
+                engine = _create_engine(name)
+            _engines[name] = engine
+    return engine
+
+
+def _create_engine(name: str) -> OCREngine:
+    if name == "tesserocr":
+        return TesserocrEngine()
+    if name == "pytesseract":
+        return PytesseractEngine()
+    raise ValueError(f"Unknown OCR engine: {name}")
+
+
+def _resolve_auto() -> str:
+    """Backend used for "auto": tesserocr only if an engine initialises"""
+    if tesserocr is None:
+        return "pytesseract"
+    try:
+        TesserocrEngine.create_api().End()
+    except RuntimeError as e:
+        print(f"Warning: tesserocr could not initialise ({str(e)}); using pytesseract")
+        return "pytesseract"
+    return "tesserocr"
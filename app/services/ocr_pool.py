@@ -0,0 +1,128 @@
+"""
+Pipelined OCR: a decode thread feeds selected frames into a bounded queue
+and a pool of Tesseract worker processes consumes it.
+"""
+
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from contextlib import nullcontext
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+_END_OF_STREAM = object()
+
+
+def create_ocr_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Process pool for Tesseract workers
+
+    Pools are created from threaded processes (the API event loop, decode
+    threads), and forking those can deadlock the children on a lock some
+    other thread held, so workers are started by a fork server, or spawned
+    where there is none.
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+
+
+def run_pipelined_ocr(
+    frames: Iterable[Tuple[int, str, np.ndarray]],
+    ocr_func: Callable[[np.ndarray], str],
+    workers: int,
+    queue_size: int = 16,
+    on_frame: Optional[Callable[[np.ndarray], Any]] = None,
+    on_result: Optional[Callable[[int, str, str, Any], None]] = None,
+    pool: Optional[Executor] = None,
+) -> List[Tuple[int, str, str, Any]]:
+    """
+    OCR selected frames on a process pool while decoding continues
+
+    Args:
+        frames: Iterable of (frame_index, timestamp_str, frame); it is consumed
+            on a dedicated decode thread
+        ocr_func: Picklable, module-level callable turning a frame into text
+        workers: Number of Tesseract worker processes
+        queue_size: Maximum number of decoded frames waiting for, or in, OCR
+        on_frame: Optional callable run on each frame as it is dispatched; its
+            return value is passed through with the OCR result
+        on_result: Optional callable receiving each (frame_index,
+            timestamp_str, text, on_frame result) as soon as it is OCR'd
+        pool: Optional process pool shared across videos, whose workers stay
+            warm between them; a pool of `workers` processes is created and
+            shut down for this call otherwise
+
+    Returns:
+        List of (frame_index, timestamp_str, text, on_frame result) in
+        timestamp order
+    """
+    frame_queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    decode_errors = []
+
+    def decode():
+        try:
+            for item in frames:
+                # Poll so the thread can exit if the consumer side failed
+                while not stop.is_set():
+                    try:
+                        frame_queue.put(item, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    return
+        except Exception as e:
+            decode_errors.append(e)
+        finally:
+            # Unblock the dispatcher even when the queue is full
+            while not stop.is_set():
+                try:
+                    frame_queue.put(_END_OF_STREAM, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+
+    decoder = threading.Thread(target=decode, name="frame-decoder", daemon=True)
+    decoder.start()
+
+    results = []
+    in_flight = {}
+
+    def collect(done):
+        for future in done:
+            frame_index, timestamp_str, extra = in_flight.pop(future)
+            result = (frame_index, timestamp_str, future.result(), extra)
+            results.append(result)
+            if on_result is not None:
+                on_result(*result)
+
+    try:
+        with create_ocr_pool(workers) if pool is None else nullcontext(pool) as pool:
+            while True:
+                item = frame_queue.get()
+                if item is _END_OF_STREAM:
+                    break
+
+                frame_index, timestamp_str, frame = item
+                future = pool.submit(ocr_func, frame)
+                extra = on_frame(frame) if on_frame is not None else None
+                in_flight[future] = (frame_index, timestamp_str, extra)
+
+                # Back-pressure: never hold more than queue_size frames in OCR
+                if len(in_flight) >= queue_size:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+
+            collect(wait(in_flight).done)
+    finally:
+        stop.set()
+        decoder.join()
+
+    if decode_errors:
+        raise decode_errors[0]
+
+    results.sort(key=lambda r: r[0])
+    return results
@@ -0,0 +1,163 @@
+"""
+Progress reporting and partial results for running extractions
+
+A ProgressTracker turns pipeline callbacks into events: progress (frames
+decoded against the total, with an ETA) and one entry per processed frame
+as soon as both its OCR text and description are known. Background jobs
+append those events to jobs/<id>/events.jsonl, which the streaming endpoint
+tails, so any process can follow a job run by another.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Callable
+
+EVENTS_FILENAME = "events.jsonl"
+
+# Minimum seconds between two progress events
+PROGRESS_INTERVAL = 0.5
+
+
+class ProgressTracker:
+    """
+    Collect per-frame results as they complete and emit them as events
+
+    Methods may be called from the decode/OCR thread and from the event loop
+    concurrently.
+
+    Args:
+        total_frames: Frame count reported by the container (0 if unknown)
+        emit: Callable receiving each event dict
+    """
+
+    def __init__(self, total_frames: int, emit: Callable[[dict], None]):
+        self.total_frames = max(0, int(total_frames))
+        self.emit = emit
+        self.frames_decoded = 0
+        self._started = time.time()
+        self._last_progress = 0.0
+        self._lock = threading.Lock()
+        self._done = {}
+        self._waiting_duplicates = {}
+
+    def frame_decoded(self, frame_index: int):
+        """Record that decoding reached frame_index; emits throttled progress"""
+        self.frames_decoded = frame_index + 1
+        now = time.time()
+        if now - self._last_progress >= PROGRESS_INTERVAL:
+            self._last_progress = now
+            self.emit(self.progress_event())
+
+    def progress_event(self) -> dict:
+        """Current progress as an event dict"""
+        elapsed = time.time() - self._started
+        decoded = min(self.frames_decoded, self.total_frames) if self.total_frames else self.frames_decoded
+        percent = eta = None
+        if self.total_frames:
+            percent = round(100.0 * decoded / self.total_frames, 1)
+            if decoded:
+                eta = round(elapsed / decoded * (self.total_frames - decoded), 1)
+        return {
+            "type": "progress",
+            "frames_decoded": decoded,
+            "total_frames": self.total_frames,
+            "percent": percent,
+            "elapsed_seconds": round(elapsed, 1),
+            "eta_seconds": eta,
+        }
+
+    def ocr_done(self, frame_index: int, timestamp_str: str, text: str, description):
+        """
+        Record a frame's OCR text; its entry is emitted once the description
+        (a string or a future resolving to one) is available
+        """
+        if hasattr(description, "add_done_callback"):
+            description.add_done_callback(
+                lambda future: self._complete(frame_index, timestamp_str, text, _future_text(future))
+            )
+        else:
+            self._complete(frame_index, timestamp_str, text, description)
+
+    def duplicate(self, frame_index: int, timestamp_str: str, original_index: int):
+        """Record a repeated frame that reuses original_index's results"""
+        with self._lock:
+            done = self._done.get(original_index)
+            if done is None:
+                self._waiting_duplicates.setdefault(original_index, []).append((frame_index, timestamp_str))
+                return
+        self._emit_entry(frame_index, timestamp_str, *done)
+
+    def _complete(self, frame_index: int, timestamp_str: str, text: str, description: str):
+        with self._lock:
+            self._done[frame_index] = (text, description)
+            waiting = self._waiting_duplicates.pop(frame_index, [])
+        self._emit_entry(frame_index, timestamp_str, text, description)
+        for duplicate_index, duplicate_timestamp in waiting:
+            self._emit_entry(duplicate_index, duplicate_timestamp, text, description)
+
+    def _emit_entry(self, frame_index: int, timestamp_str: str, text: str, description: str):
+        self.emit({
+            "type": "entry",
+            "frame_index": frame_index,
+            "time_stamp": timestamp_str,
+            "text": text,
+            "image_description": description,
+        })
+
+
+def _future_text(future) -> str:
+    try:
+        return future.result()
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
+class JobEventLog:
+    """
+    Append-only JSON Lines event file for one job
+
+    Args:
+        path: Path of the events file
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, event: dict):
+        """Append an event; usable directly as a ProgressTracker emit callable"""
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+
+def format_sse(event: dict) -> str:
+    """Format an event dict as a Server-Sent Events message"""
+    data = json.dumps(event, ensure_ascii=False)
+    return f"event: {event.get('type', 'message')}\ndata: {data}\n\n"
+
+
+def read_new_events(path: str, offset: int):
+    """
+    Read complete event lines appended after offset
+
+    Returns:
+        Tuple of (events, new_offset); a partially written last line is left
+        for the next call
+    """
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < offset:
+                # the log was restarted (job requeued); read it from the top
+                offset = 0
+            f.seek(offset)
+            chunk = f.read()
+    except FileNotFoundError:
+        return [], offset
+    end = chunk.rfind(b"\n") + 1
+    events = [json.loads(line) for line in chunk[:end].splitlines() if line.strip()]
+    return events, offset + end
+
@@ -0,0 +1,177 @@
+"""
+Persistent, content-addressed cache of extraction results
+
+Results are keyed on the video's SHA-256 plus every parameter that changes
+the output, and stored in a SQLite database under jobs/ so the API process
+and run_extraction.py subprocesses share it. The least recently used
+entries are evicted once the cache grows past its size limit.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from app.models.schemas import VideoProcessingRequest
+
+CACHE_PATH = os.environ.get("RESULT_CACHE_PATH", os.path.join("jobs", "result_cache.sqlite3"))
+CACHE_MAX_BYTES = int(os.environ.get("RESULT_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Bump when a change to the extraction pipeline alters its output
+PIPELINE_VERSION = 2
+
+# Parameters that only affect speed, never the extracted result
+PERFORMANCE_ONLY_FIELDS = {
+    "decode_threads",
+    "ocr_workers",
+    "ocr_queue_size",
+    "llm_concurrency",
+    "llm_rate_limit",
+    "llm_max_retries",
+    "description_cache",
+    "result_cache",
+    "save_frames",
+    "segment_seconds",
+}
+
+
+def cache_key(video_sha256: str, params: VideoProcessingRequest, model_name: str) -> str:
+    """
+    Build the cache key for a video and the parameters it is processed with
+
+    Args:
+        video_sha256: SHA-256 hex digest of the video content
+        params: Processing parameters
+        model_name: Name of the description model
+
+    Returns:
+        str: Hex digest identifying the result
+    """
+    payload = {
+        "video": video_sha256,
+        "params": params.model_dump(exclude=PERFORMANCE_ONLY_FIELDS),
+        "model": model_name,
+        "pipeline": PIPELINE_VERSION,
+    }
+    encoded = json.dumps(payload, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class ResultCache:
+    """
+    SQLite-backed result store with size-based LRU eviction
+
+    Args:
+        path: Database file; created on first use
+        max_bytes: Total size of stored results kept before evicting
+    """
+
+    def __init__(self, path: str = CACHE_PATH, max_bytes: int = CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY,"
+                " result TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS results_lru ON results (last_access)")
+
+    @contextmanager
+    def _connect(self):
+        # A connection per operation keeps the cache usable from any thread
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the cached result for key, or None, refreshing its LRU position"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT result FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE results SET last_access = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key: str, result: dict):
+        """Store a result and evict least recently used entries over the size limit"""
+        encoded = json.dumps(result, ensure_ascii=False, separators=(",", ":"))
+        size = len(encoded.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, result, size, created_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, encoded, size, now, now)
+            )
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            if total > self.max_bytes:
+                self._evict(conn, total - self.max_bytes)
+
+    @staticmethod
+    def _evict(conn: sqlite3.Connection, excess: int):
+        freed = 0
+        evicted = []
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY last_access"):
+            if freed >= excess:
+                break
+            evicted.append((key,))
+            freed += size
+        conn.executemany("DELETE FROM results WHERE key = ?", evicted)
+
+
+_default_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> ResultCache:
+    """Return the process-wide cache at CACHE_PATH, creating it on first use"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResultCache()
+    return _default_cache
+
+
+def has_failed_descriptions(result: dict) -> bool:
+    """True if any entry's image description is an error message instead of a description"""
+    return any(
+        (entry.get("image_description") or "").startswith("Error:")
+        for entry in result.get("detailed_extraction") or []
+    )
+
+
+def load_cached_result(key: str) -> Optional[dict]:
+    """
+    Look a result up in the default cache; cache failures count as a miss,
+    and so do results stored with failed descriptions by older versions
+    """
+    try:
+        result = get_result_cache().get(key)
+    except sqlite3.Error as e:
+        print(f"Warning: result cache lookup failed: {str(e)}")
+        return None
+    if result is not None and has_failed_descriptions(result):
+        return None
+    return result
+
+
+def store_cached_result(key: str, result: dict):
+    """Save a result to the default cache; cache failures are only logged"""
+    try:
+        get_result_cache().put(key, result)
+    except sqlite3.Error as e:
+        print(f"Warning: could not store result in cache: {str(e)}")
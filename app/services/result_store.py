@@ -0,0 +1,362 @@
+"""
+Compact, disk-backed store for job results
+
+Instead of one indented result.json per job, results are kept in a SQLite
+database under jobs/: a small summary row per job and one row per extracted
+entry, indexed by time. Readers fetch a page or a time range of entries
+without loading the whole result, and the API process keeps nothing but
+job metadata in memory.
+
+The OCR text and image descriptions of every stored job are also indexed
+in an FTS5 table, kept up to date as results are saved, for search across
+all processed videos. Builds of SQLite without FTS5 fall back to a LIKE
+scan.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+RESULT_DB_PATH = os.environ.get("RESULT_DB_PATH", os.path.join("jobs", "results.sqlite3"))
+
+# Same setting as the job database; DELETE when jobs/ is on a network filesystem
+RESULT_DB_JOURNAL_MODE = os.environ.get("JOB_DB_JOURNAL_MODE", "WAL")
+
+# Result fields rebuilt from the entry rows rather than stored in the summary
+ENTRY_FIELDS = ("detailed_extraction", "extracted_text")
+
+# Entry fields only consolidated segments have; omitted from per-frame entries
+SEGMENT_FIELDS = ("end_time", "frames")
+
+# Words of context on each side of a search match
+SNIPPET_TOKENS = 12
+
+
+def parse_timestamp(value: str) -> int:
+    """
+    Convert "HH:MM:SS", "MM:SS" or plain seconds to seconds
+
+    Raises:
+        ValueError: If the value is not a timestamp
+    """
+    seconds = 0
+    for part in str(value).strip().split(":"):
+        seconds = seconds * 60 + int(part)
+    return seconds
+
+
+def _end_seconds(end_time: Optional[str], seconds: int) -> int:
+    """Second an entry is last shown at: its end_time, or its own time_stamp"""
+    try:
+        return max(seconds, parse_timestamp(end_time)) if end_time else seconds
+    except ValueError:
+        return seconds
+
+
+class ResultStore:
+    """
+    SQLite-backed job results with paginated and time-range reads
+
+    Args:
+        path: Database file; created on first use
+    """
+
+    def __init__(self, path: str = RESULT_DB_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(f"PRAGMA journal_mode={RESULT_DB_JOURNAL_MODE}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " job_id TEXT PRIMARY KEY,"
+                " summary TEXT NOT NULL,"
+                " entry_count INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " searchable INTEGER NOT NULL DEFAULT 1)"
+            )
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(results)")}
+            if "searchable" not in columns:
+                conn.execute("ALTER TABLE results ADD COLUMN searchable INTEGER NOT NULL DEFAULT 1")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " id INTEGER PRIMARY KEY,"
+                " job_id TEXT NOT NULL,"
+                " seq INTEGER NOT NULL,"
+                " seconds INTEGER NOT NULL,"
+                " time_stamp TEXT NOT NULL,"
+                " text TEXT,"
+                " image_description TEXT,"
+                " end_time TEXT,"
+                " frames INTEGER,"
+                " end_seconds INTEGER)"
+            )
+            entry_columns = {row["name"] for row in conn.execute("PRAGMA table_info(entries)")}
+            for column, kind in (("end_time", "TEXT"), ("frames", "INTEGER"), ("end_seconds", "INTEGER")):
+                if column not in entry_columns:
+                    conn.execute(f"ALTER TABLE entries ADD COLUMN {column} {kind}")
+            if "end_seconds" not in entry_columns:
+                conn.executemany(
+                    "UPDATE entries SET end_seconds = ? WHERE id = ?",
+                    [(_end_seconds(row["end_time"], row["seconds"]), row["id"])
+                     for row in conn.execute("SELECT id, seconds, end_time FROM entries")]
+                )
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS entries_job_seq ON entries (job_id, seq)")
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_job_time ON entries (job_id, seconds)")
+            self.fts = self._create_search_index(conn)
+
+    @staticmethod
+    def _create_search_index(conn: sqlite3.Connection) -> bool:
+        """Create the FTS5 index, filling it from existing results; False without FTS5"""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'entries_fts'"
+        ).fetchone() is not None
+        if exists:
+            return True
+        try:
+            conn.execute(
+                "CREATE VIRTUAL TABLE entries_fts USING fts5("
+                " text, image_description, content='entries', content_rowid='id',"
+                " tokenize='unicode61 remove_diacritics 2')"
+            )
+        except sqlite3.OperationalError:
+            print("Warning: SQLite has no FTS5; search falls back to scanning entries")
+            return False
+        conn.execute(
+            "INSERT INTO entries_fts (rowid, text, image_description)"
+            " SELECT e.id, e.text, e.image_description FROM entries e"
+            " JOIN results r ON r.job_id = e.job_id WHERE r.searchable = 1"
+        )
+        return True
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def save(self, job_id: str, result: dict, searchable: bool = True):
+        """
+        Store a result, replacing any previous one for the job
+
+        Args:
+            searchable: Add the entries to the search index; off for
+                intermediate results such as shard segments
+        """
+        summary = {key: value for key, value in result.items() if key not in ENTRY_FIELDS}
+        entries = result.get("detailed_extraction") or []
+        rows = []
+        for seq, entry in enumerate(entries):
+            try:
+                seconds = parse_timestamp(entry.get("time_stamp", "0"))
+            except ValueError:
+                seconds = 0
+            rows.append((job_id, seq, seconds, entry.get("time_stamp", ""), entry.get("text"),
+                         entry.get("image_description"), entry.get("end_time"), entry.get("frames"),
+                         _end_seconds(entry.get("end_time"), seconds)))
+        with self._connect() as conn:
+            self._delete(conn, job_id)
+            conn.execute(
+                "INSERT INTO results (job_id, summary, entry_count, created_at, searchable)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (job_id, json.dumps(summary, ensure_ascii=False, separators=(",", ":")), len(rows), time.time(),
+                 int(searchable))
+            )
+            conn.executemany(
+                "INSERT INTO entries (job_id, seq, seconds, time_stamp, text, image_description, end_time, frames,"
+                " end_seconds) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            if searchable and self.fts:
+                conn.execute(
+                    "INSERT INTO entries_fts (rowid, text, image_description)"
+                    " SELECT id, text, image_description FROM entries WHERE job_id = ?",
+                    (job_id,)
+                )
+
+    def import_file(self, job_id: str, path: str) -> bool:
+        """Copy a legacy result.json into the store; returns False if it does not exist"""
+        if not os.path.exists(path):
+            return False
+        with open(path, "r", encoding="utf-8") as f:
+            self.save(job_id, json.load(f))
+        return True
+
+    def summary(self, job_id: str) -> Optional[dict]:
+        """Result fields other than the entries, plus entry_count; None if absent"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT summary, entry_count FROM results WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {**json.loads(row["summary"]), "entry_count": row["entry_count"]}
+
+    @staticmethod
+    def _range_clause(start: Optional[int], end: Optional[int]):
+        # Entries overlapping the range: a segment that starts before it
+        # but is still showing at its start is included
+        clause, args = "", []
+        if start is not None:
+            clause += " AND end_seconds >= ?"
+            args.append(start)
+        if end is not None:
+            clause += " AND seconds <= ?"
+            args.append(end)
+        return clause, args
+
+    def entries(
+        self,
+        job_id: str,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None
+    ) -> List[dict]:
+        """
+        Entries of a job in timestamp order
+
+        Args:
+            offset: Entries to skip
+            limit: Maximum entries returned (None = all)
+            start: Only entries still showing at or after this second
+                (a segment until its end_time)
+            end: Only entries starting at or before this second
+        """
+        clause, args = self._range_clause(start, end)
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT time_stamp, text, image_description, end_time, frames FROM entries"
+                f" WHERE job_id = ?{clause} ORDER BY seq LIMIT ? OFFSET ?",
+                [job_id, *args, -1 if limit is None else limit, offset]
+            ).fetchall()
+        return [
+            {key: value for key, value in dict(row).items() if value is not None or key not in SEGMENT_FIELDS}
+            for row in rows
+        ]
+
+    def count(self, job_id: str, start: Optional[int] = None, end: Optional[int] = None) -> int:
+        """Number of entries of a job, optionally within a time range"""
+        clause, args = self._range_clause(start, end)
+        with self._connect() as conn:
+            return conn.execute(
+                f"SELECT COUNT(*) FROM entries WHERE job_id = ?{clause}", [job_id, *args]
+            ).fetchone()[0]
+
+    def iter_entries(self, job_id: str, page_size: int = 500) -> Iterator[dict]:
+        """Yield every entry of a job, reading one page at a time"""
+        offset = 0
+        while True:
+            page = self.entries(job_id, offset, page_size)
+            yield from page
+            if len(page) < page_size:
+                return
+            offset += page_size
+
+    def load(self, job_id: str) -> Optional[dict]:
+        """The full result as originally saved, or None"""
+        summary = self.summary(job_id)
+        if summary is None:
+            return None
+        summary.pop("entry_count")
+        entries = self.entries(job_id)
+        return {**summary, "extracted_text": [e["text"] for e in entries], "detailed_extraction": entries}
+
+    def _delete(self, conn: sqlite3.Connection, job_id: str):
+        if self.fts:
+            # External-content FTS5 rows are removed with the values they indexed
+            conn.execute(
+                "INSERT INTO entries_fts (entries_fts, rowid, text, image_description)"
+                " SELECT 'delete', e.id, e.text, e.image_description FROM entries e"
+                " JOIN results r ON r.job_id = e.job_id WHERE e.job_id = ? AND r.searchable = 1",
+                (job_id,)
+            )
+        conn.execute("DELETE FROM entries WHERE job_id = ?", (job_id,))
+        conn.execute("DELETE FROM results WHERE job_id = ?", (job_id,))
+
+    @staticmethod
+    def _match_query(query: str) -> str:
+        # Quote every word so user input is never parsed as FTS5 syntax;
+        # the words are then ANDed
+        words = re.findall(r"\w+", query)
+        return " ".join(f'"{word}"' for word in words)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        offset: int = 0,
+        job_id: Optional[str] = None,
+        order: str = "recent"
+    ) -> List[dict]:
+        """
+        Find entries whose OCR text or description contains every word of query
+
+        Args:
+            query: Words to look for
+            limit: Maximum hits returned
+            offset: Hits to skip
+            job_id: Only search this job
+            order: "recent" lists the newest results first and stays fast
+                however many entries match; "relevance" ranks by BM25, which
+                scores every match
+
+        Returns:
+            List of dicts with job_id, time_stamp, seconds and snippet
+        """
+        match = self._match_query(query)
+        if not match:
+            return []
+        job_clause, job_args = ("", []) if job_id is None else (" AND e.job_id = ?", [job_id])
+        with self._connect() as conn:
+            if self.fts:
+                rows = conn.execute(
+                    "SELECT e.job_id, e.time_stamp, e.seconds,"
+                    f" snippet(entries_fts, -1, '[', ']', '...', {SNIPPET_TOKENS}) AS snippet"
+                    " FROM entries_fts JOIN entries e ON e.id = entries_fts.rowid"
+                    f" WHERE entries_fts MATCH ?{job_clause}"
+                    f" ORDER BY {'rank' if order == 'relevance' else 'entries_fts.rowid DESC'}"
+                    " LIMIT ? OFFSET ?",
+                    [match, *job_args, limit, offset]
+                ).fetchall()
+                return [dict(row) for row in rows]
+
+            words = re.findall(r"\w+", query)
+            clause = " AND ".join(
+                "(e.text LIKE ? OR e.image_description LIKE ?)" for _ in words
+            )
+            args = [pattern for word in words for pattern in (f"%{word}%", f"%{word}%")]
+            rows = conn.execute(
+                "SELECT e.job_id, e.time_stamp, e.seconds, e.text AS snippet FROM entries e"
+                " JOIN results r ON r.job_id = e.job_id"
+                f" WHERE r.searchable = 1 AND {clause}{job_clause}"
+                " ORDER BY e.id DESC LIMIT ? OFFSET ?",
+                [*args, *job_args, limit, offset]
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def delete(self, job_ids: List[str]):
+        """Remove the results of the given jobs"""
+        with self._connect() as conn:
+            for job_id in job_ids:
+                self._delete(conn, job_id)
+
+
+_default_store: Optional[ResultStore] = None
+
+
+def get_result_store() -> ResultStore:
+    """Return the process-wide store at RESULT_DB_PATH, creating it on first use"""
+    global _default_store
+    if _default_store is None:
+        _default_store = ResultStore()
+    return _default_store
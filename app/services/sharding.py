@@ -0,0 +1,179 @@
+"""
+Split long videos into time segments that job workers process in parallel
+
+Each segment starts decoding a little before its first frame so change
+detection has the same previous frame, noise floor estimate and settled
+picture a linear pass would have had; frames selected in that warm-up
+overlap belong to the previous segment and are dropped, and are not counted
+in the segment's frame statistics. Segment results hold one entry per
+selected frame and are concatenated in order, giving the entries a linear
+pass selects. When consolidation is on, the concatenation is consolidated
+once, as a linear pass would, so a slide cut by a boundary becomes one
+segment; such merges are reported under consolidation.
+"""
+
+import math
+from typing import List, NamedTuple, Optional
+
+import cv2
+
+from app.models.schemas import VideoProcessingRequest
+from app.services.change_detection import NOISE_WINDOW, settle_samples_for
+from app.services.decoding import open_video
+from app.services.frame_source import frame_step_for
+from app.services.transcript import consolidate_entries, shingles, similarity
+
+# Minimum warm-up decoded before each segment's first frame; adaptive
+# frame selection extends it to cover its settling and noise estimate
+SEGMENT_OVERLAP_SECONDS = 2.0
+
+# A trailing segment shorter than this share of segment_seconds is folded
+# into the one before it
+MIN_TAIL_FRACTION = 0.25
+
+
+class Segment(NamedTuple):
+    """Frame range of one segment"""
+    index: int
+    decode_from: int  # first decoded frame (warm-up)
+    start_frame: int  # first frame whose results the segment keeps
+    end_frame: Optional[int]  # exclusive; None = end of the video
+
+
+def plan_segments(
+    total_frames: int,
+    fps: float,
+    segment_seconds: float,
+    frame_step: int = 1,
+    overlap_seconds: float = SEGMENT_OVERLAP_SECONDS
+) -> List[Segment]:
+    """
+    Cut a video into segments aligned to the sampling grid
+
+    Args:
+        total_frames: Frame count reported by the container
+        fps: Frames per second
+        segment_seconds: Target segment length
+        frame_step: Frames between samples; boundaries are multiples of it
+            so every segment samples the same frames as a linear pass
+        overlap_seconds: Warm-up decoded before each segment
+
+    Returns:
+        List of Segments; a single segment when the video is too short to
+        split or its length is unknown
+    """
+    frame_step = max(1, int(frame_step))
+    if total_frames <= 0 or fps <= 0 or not segment_seconds or segment_seconds <= 0:
+        return [Segment(0, 0, 0, None)]
+
+    segment_frames = max(frame_step, int(math.ceil(segment_seconds * fps / frame_step)) * frame_step)
+    overlap = max(frame_step, int(math.ceil(overlap_seconds * fps / frame_step)) * frame_step)
+
+    segments = []
+    start = 0
+    while start < total_frames:
+        end = start + segment_frames
+        if total_frames - end < segment_frames * MIN_TAIL_FRACTION:
+            end = None
+        segments.append(Segment(len(segments), max(0, start - overlap), start, end))
+        if end is None:
+            break
+        start = end
+    return segments
+
+
+def plan_video_segments(video_path: str, params: VideoProcessingRequest) -> List[Segment]:
+    """Plan the segments of a video file for the given processing parameters"""
+    cap = open_video(video_path, params.decode_backend)
+    try:
+        if not cap.isOpened():
+            return [Segment(0, 0, 0, None)]
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        cap.release()
+    frame_step = frame_step_for(fps, sample_rate=params.sample_rate)
+    overlap_seconds = SEGMENT_OVERLAP_SECONDS
+    if params.frame_selection != "fixed" and fps > 0:
+        # A full noise window plus a settled change before the segment
+        # starts, so the threshold and selections are those of a linear pass
+        warmup_samples = NOISE_WINDOW + settle_samples_for(params.settle_seconds, fps, frame_step)
+        overlap_seconds = max(overlap_seconds, warmup_samples * frame_step / fps)
+    return plan_segments(total_frames, fps, params.segment_seconds, frame_step, overlap_seconds)
+
+
+def merge_segment_results(
+    results: List[dict],
+    processing_time: float,
+    min_similarity: Optional[float] = None
+) -> dict:
+    """
+    Combine per-segment extraction results into one result for the video
+
+    Args:
+        results: Segment results in segment order
+        processing_time: Wall time of the whole sharded job
+        min_similarity: consolidate_similarity when the job consolidates
+            its entries; None keeps one entry per frame
+
+    Returns:
+        dict shaped like a text_extractor_from_path result
+    """
+    entries = []
+    boundary_merges = 0
+    for result in results:
+        segment_entries = result.get("detailed_extraction", [])
+        if entries and segment_entries and min_similarity is not None:
+            if similarity(shingles(entries[-1]["text"]), shingles(segment_entries[0]["text"])) >= min_similarity:
+                # Same comparison consolidate_entries makes: the slide cut by
+                # the boundary becomes one segment below
+                boundary_merges += 1
+        entries.extend(segment_entries)
+    # Results of older versions may hold already consolidated entries
+    frame_count = sum(entry.get("frames") or 1 for entry in entries)
+    consolidation = None
+    if min_similarity is not None:
+        entries = consolidate_entries(entries, min_similarity)
+        consolidation = {
+            "frames": frame_count,
+            "segments": len(entries),
+            "boundary_merges": boundary_merges,
+        }
+
+    ocr_timing = {}
+    metrics = {"stages_ms": {}, "counters": {}}
+    for result in results:
+        for key, value in (result.get("ocr_timing") or {}).items():
+            if isinstance(value, (int, float)):
+                ocr_timing[key] = round(ocr_timing.get(key, 0) + value, 1)
+            else:
+                ocr_timing.setdefault(key, value)
+        for group in ("stages_ms", "counters"):
+            for key, value in (result.get("metrics") or {}).get(group, {}).items():
+                metrics[group][key] = round(metrics[group].get(key, 0) + value, 1)
+    frame_selection = {}
+    for result in results:
+        for key, value in (result.get("frame_selection") or {}).items():
+            if key in ("selected", "skipped"):
+                frame_selection[key] = frame_selection.get(key, 0) + value
+            else:
+                # Noise floor and threshold are per segment; report the first
+                frame_selection.setdefault(key, value)
+
+    return {
+        "success": True,
+        "message": f"Extracted text from {frame_count} frames.",
+        "extracted_text": [entry["text"] for entry in entries],
+        "detailed_extraction": entries,
+        "frame_count": frame_count,
+        "segment_count": len(entries) if consolidation is not None else None,
+        "dedup_cache_hits": sum(r.get("dedup_cache_hits", 0) for r in results),
+        "ocr_timing": ocr_timing,
+        "frame_selection": frame_selection,
+        "consolidation": consolidation,
+        "metrics": metrics,
+        "processing_time": round(processing_time, 2),
+        "video_sha256": results[0].get("video_sha256") if results else None,
+        "segments": len(results),
+        "cache_hit": False,
+    }
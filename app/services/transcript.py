@@ -0,0 +1,145 @@
+"""
+Transcript consolidation: consecutive entries showing the same slide are
+merged into one segment with a start and end time and one canonical text
+
+Entries are compared by the Jaccard similarity of their character
+shingles, so OCR noise (a misread letter, a dropped line) barely moves the
+similarity while a different slide does. Each entry is compared only with
+the one before it, so a slide whose bullets are revealed one by one stays
+one segment and the pass is linear in the total text length. The canonical
+text of a segment is picked with MinHash signatures, which also keeps that
+step linear however many entries a segment has.
+"""
+
+import re
+from typing import List, Optional
+
+import numpy as np
+
+# Characters per shingle
+SHINGLE_SIZE = 4
+
+# Hash functions per MinHash signature
+NUM_HASHES = 64
+
+# Multiply-shift hash functions: the top 32 bits of a * x + b (mod 2**64)
+# with random odd a, which needs no modulo
+_rng = np.random.RandomState(20240601)
+_A = _rng.randint(0, 1 << 63, NUM_HASHES, dtype=np.int64).astype(np.uint64) * np.uint64(2) + np.uint64(1)
+_B = _rng.randint(0, 1 << 63, NUM_HASHES, dtype=np.int64).astype(np.uint64)
+_SHINGLE_BASE = np.uint64(1000003)
+
+
+def _normalized(text: str) -> str:
+    words = re.sub(r"[^\w\s]", " ", (text or "").lower()).split()
+    return " ".join(words)
+
+
+def shingles(text: str) -> Optional[np.ndarray]:
+    """
+    Hashes of a text's character shingles after normalising case,
+    punctuation and whitespace
+
+    Returns:
+        Sorted array of distinct uint64 hashes, or None for text without words
+    """
+    text = _normalized(text)
+    if not text:
+        return None
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    # Polynomial hash of every SHINGLE_SIZE-character window, wrapping at 2**64
+    size = min(SHINGLE_SIZE, len(codes))
+    hashes = np.zeros(len(codes) - size + 1, dtype=np.uint64)
+    for offset in range(size):
+        hashes = hashes * _SHINGLE_BASE + codes[offset:offset + len(hashes)]
+    return np.unique(hashes)
+
+
+def minhash(hashes: np.ndarray) -> np.ndarray:
+    """MinHash signature (NUM_HASHES values) of a shingle hash array"""
+    return ((hashes[:, None] * _A + _B) >> np.uint64(32)).min(axis=0)
+
+
+def similarity(a: Optional[np.ndarray], b: Optional[np.ndarray]) -> float:
+    """Jaccard similarity of two shingle hash arrays; empty texts only match each other"""
+    if a is None or b is None:
+        return 1.0 if a is None and b is None else 0.0
+    shared = np.intersect1d(a, b, assume_unique=True).size
+    return shared / (a.size + b.size - shared)
+
+
+def _canonical(members: List[dict], signatures: List[Optional[np.ndarray]], weights: List[int]) -> dict:
+    """
+    The member that best covers a segment
+
+    A text holding every shingle of another has a minimum no larger than
+    the other's for every hash function, so each member scores the frames
+    whose signature values are at least its own, summed over the hash
+    functions. The fullest build of a slide scores highest, and a clean read
+    beats noisy ones, whose misread shingles lose to every other member.
+    Ties go to the longer text.
+    """
+    present = [i for i, signature in enumerate(signatures) if signature is not None]
+    if len(present) <= 1:
+        return members[present[0] if present else 0]
+    stacked = np.stack([signatures[i] for i in present])
+    member_weights = np.array([weights[i] for i in present], dtype=np.float64)
+    # For every hash function, the weight of members with a value >= each
+    # member's: sort the column and sum the weights from the top, equal
+    # values sharing the sum of their first occurrence
+    order = np.argsort(stacked, axis=0, kind="stable")
+    ordered = np.take_along_axis(stacked, order, axis=0)
+    at_least = np.cumsum(member_weights[order][::-1], axis=0)[::-1]
+    rows = np.arange(len(present))[:, None]
+    run_start = np.maximum.accumulate(
+        np.where(np.vstack([np.ones((1, NUM_HASHES), bool), ordered[1:] != ordered[:-1]]), rows, 0), axis=0
+    )
+    support = np.empty_like(at_least)
+    np.put_along_axis(support, order, np.take_along_axis(at_least, run_start, axis=0), axis=0)
+    scores = support.sum(axis=1)
+    best = max(range(len(present)), key=lambda i: (scores[i], len(members[present[i]]["text"] or "")))
+    return members[present[best]]
+
+
+def consolidate_entries(entries: List[dict], min_similarity: float = 0.7) -> List[dict]:
+    """
+    Merge runs of consecutive entries with similar text into slide segments
+
+    Args:
+        entries: detailed_extraction entries in time order; entries that are
+            already segments (with end_time and frames) can be consolidated
+            again, e.g. after concatenating sharded results
+        min_similarity: Jaccard similarity of character shingles to the
+            previous entry at or above which an entry joins its segment
+
+    Returns:
+        One entry per segment: time_stamp of its first entry, end_time of
+        its last, the canonical entry's text and image_description, and the
+        number of frames it covers
+    """
+    segments = []
+    members, signatures, weights = [], [], []
+    previous = None
+
+    def close():
+        canonical = _canonical(members, signatures, weights)
+        segments.append({
+            "time_stamp": members[0]["time_stamp"],
+            "end_time": members[-1].get("end_time") or members[-1]["time_stamp"],
+            "text": canonical["text"],
+            "image_description": canonical.get("image_description"),
+            "frames": sum(weights),
+        })
+
+    for entry in entries:
+        current = shingles(entry.get("text"))
+        if members and similarity(previous, current) < min_similarity:
+            close()
+            members, signatures, weights = [], [], []
+        members.append(entry)
+        signatures.append(minhash(current) if current is not None else None)
+        weights.append(entry.get("frames") or 1)
+        previous = current
+    if members:
+        close()
+    return segments
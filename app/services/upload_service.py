@@ -0,0 +1,83 @@
+"""
+Streaming upload handling: uploaded videos are written to disk in fixed-size
+chunks while their content hash is computed
+"""
+
+import hashlib
+import os
+from typing import NamedTuple, Optional
+
+import aiofiles
+
+# Bytes read from the upload per chunk
+CHUNK_SIZE = 1024 * 1024
+
+# Optional upload size limit in bytes (unset or 0 = unlimited)
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", "0")) or None
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured size limit"""
+
+
+class SavedUpload(NamedTuple):
+    """Location, size and SHA-256 of an upload written to disk"""
+    path: str
+    size: int
+    sha256: str
+
+
+async def save_upload(
+    upload_file,
+    destination: str,
+    chunk_size: int = CHUNK_SIZE,
+    max_bytes: Optional[int] = MAX_UPLOAD_BYTES
+) -> SavedUpload:
+    """
+    Stream an uploaded file to disk without holding it in memory
+
+    Args:
+        upload_file: UploadFile, or any object with an async read(size)
+        destination: Path to write the file to
+        chunk_size: Bytes read and written per chunk
+        max_bytes: Maximum accepted size; the partial file is removed and
+            UploadTooLargeError raised when it is exceeded
+
+    Returns:
+        SavedUpload with the path, size in bytes and SHA-256 hex digest
+    """
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(destination, "wb") as out:
+            while True:
+                chunk = await upload_file.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise UploadTooLargeError(
+                        f"Upload exceeds the {max_bytes} byte limit"
+                    )
+                digest.update(chunk)
+                await out.write(chunk)
+    except BaseException:
+        if os.path.exists(destination):
+            os.unlink(destination)
+        raise
+
+    return SavedUpload(path=destination, size=size, sha256=digest.hexdigest())
+
+
+def hash_file(path: str, chunk_size: int = CHUNK_SIZE) -> str:
+    """
+    SHA-256 of a file on disk, read in chunks
+
+    Returns:
+        str: Hex digest, matching SavedUpload.sha256 for the same content
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -1,20 +1,46 @@
 
 
-import pytesseract
+import asyncio
+import functools
 import cv2
-from PIL import Image, ImageOps, ImageFilter
-import json
 import numpy as np
 import tempfile
 import os
 import time
-from typing import List
-from fastapi import UploadFile
+from concurrent.futures import Executor
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, List, Optional, Tuple
 from app.models.schemas import TextExtractionResponse, VideoProcessingRequest
-from app.services.LLM_service import extract_screen_description
-
-
-def validate_video_file(video_file: UploadFile) -> bool:
+from app.services.LLM_service import MODEL_NAME, DescriptionStage, extract_screen_description
+from app.services.artifacts import ARTIFACTS_ROOT, ArtifactWriter, frame_artifact_name, open_artifact_writer
+from app.services.change_detection import (
+    AdaptiveChangeDetector, ChangeDetector, diff_stats, settle_samples_for, to_gray_thumbnail
+)
+from app.services.decoding import open_video
+from app.services.description_cache import get_description_cache
+from app.services.frame_hash import FrameHashIndex, dhash
+from app.services.frame_source import frame_step_for, iter_sampled_frames
+from app.services.incremental_ocr import IncrementalOCR
+from app.services.metrics import PipelineMetrics, record_job_metrics
+from app.services.ocr_engine import get_ocr_engine
+from app.services.ocr_pool import run_pipelined_ocr
+from app.services.progress import ProgressTracker
+from app.services.result_cache import cache_key, has_failed_descriptions, load_cached_result, store_cached_result
+from app.services.sharding import Segment
+from app.services.text_regions import (
+    MAX_REGION_COVERAGE, detect_text_regions, region_coverage, stack_regions, text_region_image
+)
+from app.services.transcript import consolidate_entries
+from app.services.upload_service import UploadTooLargeError, hash_file, save_upload
+
+if TYPE_CHECKING:
+    # fastapi is only needed for the annotation; job workers never import it
+    from fastapi import UploadFile
+
+# Accepted video file extensions
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.wmv')
+
+
+def validate_video_file(video_file: "UploadFile") -> bool:
     """
     Validate uploaded video file
     
@@ -24,13 +50,12 @@ def validate_video_file(video_file: UploadFile) -> bool:
     Returns:
         bool: True if valid video file
     """
-    allowed_extensions = ['.mp4', '.avi', '.mov', '.mkv', '.wmv']
     file_extension = os.path.splitext(video_file.filename.lower())[1]
-    return file_extension in allowed_extensions
+    return file_extension in VIDEO_EXTENSIONS
 
 
 async def extract_text_from_video(
-    video_file: UploadFile, 
+    video_file: "UploadFile", 
     params: VideoProcessingRequest
 ) -> TextExtractionResponse:
     """
@@ -49,12 +74,17 @@ async def extract_text_from_video(
     
     # Create temporary file for video processing
     with tempfile.NamedTemporaryFile(delete=False, suffix='.mp4') as temp_file:
-        temp_file.write(await video_file.read())
         temp_file_path = temp_file.name
-    
+
     try:
+        # Stream the upload to disk in chunks instead of reading it into memory
+        await save_upload(video_file, temp_file_path)
+
         # Open video file
-        cap = cv2.VideoCapture(temp_file_path)
+        cap = open_video(
+            temp_file_path, params.decode_backend, params.decode_gray, params.decode_max_height,
+            params.decode_threads or 0
+        )
         
         if not cap.isOpened():
             return TextExtractionResponse(
@@ -62,22 +92,20 @@ async def extract_text_from_video(
                 message="Could not open video file"
             )
         
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        current_frame = 0
-        
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            # Process every nth frame based on frame_interval
-            if current_frame % params.frame_interval == 0:
-                text = extract_text_from_frame(frame, params.confidence_threshold)
-                if text.strip():  # Only add non-empty text
-                    extracted_texts.append(text.strip())
-                frame_count += 1
-            
-            current_frame += 1
+        frame_step = frame_step_for(
+            cap.get(cv2.CAP_PROP_FPS),
+            frame_interval=params.frame_interval,
+            sample_rate=params.sample_rate
+        )
+
+        # Process every nth frame; frames in between are never retrieved
+        for _, frame in iter_sampled_frames(cap, frame_step):
+            text = extract_text_from_frame(
+                frame, params.confidence_threshold, params.ocr_mode, params.ocr_engine
+            )
+            if text.strip():  # Only add non-empty text
+                extracted_texts.append(text.strip())
+            frame_count += 1
         
         cap.release()
         
@@ -105,19 +133,27 @@ async def extract_text_from_video(
         )
 
 
-def extract_text_from_frame(frame: np.ndarray, confidence_threshold: float = 0.5) -> str:
+def extract_text_from_frame(
+    frame: np.ndarray,
+    confidence_threshold: float = 0.5,
+    ocr_mode: str = "accurate",
+    ocr_engine: str = "auto"
+) -> str:
     """
     Extract text from a single video frame
     
     Args:
         frame: Video frame as numpy array
         confidence_threshold: Minimum confidence for OCR results
+        ocr_mode: "accurate" reads the whole frame, "fast" only the
+            detected text regions
+        ocr_engine: OCR backend name passed to get_ocr_engine
         
     Returns:
         str: Extracted text from frame
     """
     # Convert frame to grayscale for better OCR performance
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
     
     # Apply some preprocessing to improve OCR accuracy
     # Apply Gaussian blur to reduce noise
@@ -125,15 +161,23 @@ def extract_text_from_frame(frame: np.ndarray, confidence_threshold: float = 0.5
     
     # Apply threshold to get a binary image
     _, threshold = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+    if ocr_mode == "fast":
+        # Only show Tesseract the detected text regions
+        threshold = text_region_image(gray, threshold)
+        if threshold is None:
+            return ""
     
-    # Use pytesseract to extract text with confidence scores
+    engine = get_ocr_engine(ocr_engine)
+
+    # Use the OCR engine to extract text with confidence scores
     try:
-        data = pytesseract.image_to_data(threshold, output_type=pytesseract.Output.DICT)
+        data = engine.image_to_data(threshold)
         
         # Filter text based on confidence threshold
         extracted_text = []
         for i, confidence in enumerate(data['conf']):
-            if int(confidence) > confidence_threshold * 100:  # pytesseract confidence is 0-100
+            if int(confidence) > confidence_threshold * 100:  # Tesseract confidence is 0-100
                 text = data['text'][i].strip()
                 if text:
                     extracted_text.append(text)
@@ -142,22 +186,18 @@ def extract_text_from_frame(frame: np.ndarray, confidence_threshold: float = 0.5
     
     except Exception:
         # Fallback to simple text extraction if confidence filtering fails
-        return pytesseract.image_to_string(threshold).strip()
+        return engine.image_to_string(threshold).strip()
 
 
 
 
 def select_frame(image, prev_image):
     # Convert to grayscale
-    img1 = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
-    img2 = cv2.cvtColor(prev_image, cv2.COLOR_RGB2GRAY)
-
-    # Compute grayscale image difference
-    grayscale_diff = cv2.absdiff(img1, img2)
+    img1 = to_gray_thumbnail(image)
+    img2 = to_gray_thumbnail(prev_image)
 
-    # Compute mean and standard deviation
-    mean_diff = np.mean(grayscale_diff)
-    std_diff = np.std(grayscale_diff)
+    # Compute mean and standard deviation of the grayscale image difference
+    mean_diff, std_diff = diff_stats(img1, img2)
 
     return mean_diff, std_diff
 
@@ -184,19 +224,48 @@ def process_each_frame(frame,prev_frame,frame_count,fps,list_of_texts):
 
 
 
-def text_extractor(image):
-    os.makedirs('extracted_frames', exist_ok=True)
-    os.makedirs('threshold', exist_ok=True)
+def text_extractor(image, ocr_mode: str = "accurate", ocr_engine: str = "auto"):
+    extracted_text, _ = text_extractor_timed(image, ocr_mode, ocr_engine)
+    return extracted_text
 
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    cv2.imwrite(f"extracted_frames/frame_{int(time.time())}.jpg", gray)
 
-    _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-    cv2.imwrite(f"threshold/thresh_{int(time.time())}.jpg", thresh)
+def text_extractor_timed(image, ocr_mode: str = "accurate", ocr_engine: str = "auto") -> Tuple[str, dict]:
+    """
+    OCR a selected frame and report how long each stage took
 
-    extracted_text = pytesseract.image_to_string(gray)
+    Args:
+        image: BGR or grayscale video frame
+        ocr_mode: "accurate" reads the whole frame; "fast" detects text
+            regions first and OCRs only those, stacked into one image
+        ocr_engine: OCR backend name passed to get_ocr_engine; the engine is
+            created once per process and reused for every frame
 
-    return extracted_text
+    Returns:
+        Tuple of (extracted_text, timings) where timings holds
+        region_detection_ms, ocr_ms and the number of regions OCR'd
+    """
+    timings = {"region_detection_ms": 0.0, "ocr_ms": 0.0, "regions": 0}
+
+    # Tesseract binarizes internally, so the grayscale frame is OCR'd as is
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+
+    ocr_input = gray
+    if ocr_mode == "fast":
+        started = time.perf_counter()
+        boxes = detect_text_regions(gray)
+        if boxes and region_coverage(boxes, gray.shape) <= MAX_REGION_COVERAGE:
+            ocr_input = stack_regions(gray, boxes)
+        timings["region_detection_ms"] = (time.perf_counter() - started) * 1000
+        timings["regions"] = len(boxes)
+        if not boxes:
+            # Nothing that looks like text: skip Tesseract entirely
+            return "", timings
+
+    started = time.perf_counter()
+    extracted_text = get_ocr_engine(ocr_engine).image_to_string(ocr_input)
+    timings["ocr_ms"] = (time.perf_counter() - started) * 1000
+
+    return extracted_text, timings
 
 
 def optical_flow_mean_mag(previous, next):
@@ -212,98 +281,536 @@ def optical_flow_mean_mag(previous, next):
     return mean_mag
 
 
-async def text_extractor_from_video(video_file: UploadFile):
-    print(f"Processing video: {video_file.filename}")
+def no_description(frame) -> None:
+    """describe callable of OCR-only runs: frames get no image_description"""
+    return None
 
-    # Create a temporary file to save the uploaded video
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as temp_file:
-        try:
-            # Read the uploaded file content
-            content = await video_file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
-        except Exception as e:
-            raise Exception(f"Error saving uploaded file: {str(e)}")
+
+def select_changed_frames(
+    sampled: Iterable[Tuple[int, np.ndarray]],
+    fps: float,
+    detector: Optional[ChangeDetector] = None,
+    on_sample: Optional[Callable[[int], None]] = None,
+    metrics: Optional[PipelineMetrics] = None,
+    start_frame: int = 0,
+    at_end: bool = True
+) -> Iterator[Tuple[int, str, np.ndarray]]:
+    """
+    Frame selection stage: yield the sampled frames the detector picks
+
+    Args:
+        sampled: Iterable of (frame_index, frame), e.g. from
+            iter_sampled_frames or a live stream reader
+        fps: Frames per second, for timestamps
+        detector: ChangeDetector to use; defaults to full-resolution
+            detection with the std_diff > 4 threshold
+        on_sample: Optional callable receiving the index of every sampled
+            frame, e.g. for progress reporting
+        metrics: Optional PipelineMetrics receiving decode and change
+            detection time and the frames seen/selected counters
+        start_frame: Frames before this index are compared but not yielded
+            or counted
+        at_end: Whether sampled ends at the end of the video, so a change
+            still settling then is yielded with the last frame
+
+    Yields:
+        Tuple of (frame_index, timestamp_str, frame) for each selected frame
+    """
+    detector = detector or ChangeDetector()
+    metrics = metrics or PipelineMetrics()
+
+    def selected(frame_count, image):
+        metrics.count("frames_selected")
+        timestamp = frame_count / fps
+        timestamp_str = time.strftime('%H:%M:%S', time.gmtime(timestamp))
+        return frame_count, timestamp_str, image
+
+    last = None
+    counting = start_frame <= 0
+    for frame_count, image in metrics.timed_iter("decode", sampled):
+        if not counting and frame_count >= start_frame:
+            # Warm-up frames belong to the previous segment, which counts them
+            detector.reset_counts()
+            counting = True
+        if counting:
+            metrics.count("frames_seen")
+        if on_sample is not None:
+            on_sample(frame_count)
+        with metrics.timed("change_detection"):
+            changed = detector.is_change(image)
+        last = (frame_count, image)
+        if changed and frame_count >= start_frame:
+            yield selected(frame_count, image)
+
+    if at_end and last is not None and last[0] >= start_frame and detector.finish():
+        yield selected(*last)
+
+
+def iter_selected_frames(
+    cap,
+    frame_step: int = 1,
+    detector: Optional[ChangeDetector] = None,
+    on_sample: Optional[Callable[[int], None]] = None,
+    metrics: Optional[PipelineMetrics] = None,
+    segment: Optional[Segment] = None
+):
+    """
+    Decode a video and yield the frames that differ from their predecessor
+
+    Args:
+        cap: Capture from open_video (or an opened cv2.VideoCapture)
+        frame_step: Compare every frame_step-th frame; skipped frames are
+            grabbed without being converted to BGR
+        detector: ChangeDetector to use; defaults to full-resolution
+            detection with the std_diff > 4 threshold. A change still
+            settling when the video ends is yielded with the last frame
+        on_sample: Optional callable receiving the index of every decoded
+            frame, e.g. for progress reporting
+        metrics: Optional PipelineMetrics receiving decode and change
+            detection time and the frames seen/selected counters
+        segment: Optional Segment limiting decoding to its frame range;
+            frames selected during its warm-up are not yielded
+
+    Yields:
+        Tuple of (frame_index, timestamp_str, frame) for each selected frame
+    """
+    fps = cap.get(cv2.CAP_PROP_FPS)  # Frames per second of the video
+    segment = segment or Segment(0, 0, 0, None)
+    sampled = iter_sampled_frames(cap, frame_step, segment.decode_from, segment.end_frame)
+
+    # A segment's pending change settles in the next segment instead
+    yield from select_changed_frames(
+        sampled, fps, detector, on_sample, metrics, segment.start_frame, at_end=segment.end_frame is None
+    )
+
+    print("End of video reached or cannot fetch the frame.")
+
+
+def make_change_detector(params: VideoProcessingRequest, fps: float, frame_step: int) -> ChangeDetector:
+    """Change detector configured by the frame_selection parameters"""
+    if params.frame_selection == "fixed":
+        return ChangeDetector(scale=params.change_scale)
+    settle_samples = settle_samples_for(params.settle_seconds, fps, frame_step)
+    return AdaptiveChangeDetector(scale=params.change_scale, settle_samples=settle_samples)
+
+
+def iter_unique_frames(
+    frames: Iterable[Tuple[int, str, np.ndarray]],
+    hash_index: FrameHashIndex,
+    metrics: Optional[PipelineMetrics] = None,
+    on_duplicate: Optional[Callable[[int, str, int], None]] = None
+) -> Iterator[Tuple[int, str, np.ndarray]]:
+    """
+    Dedup stage: drop frames whose perceptual hash matches an earlier frame
+    and whose thumbnail confirms the match pixel-wise
+
+    Args:
+        frames: Iterable of (frame_index, timestamp_str, frame)
+        hash_index: FrameHashIndex of the frames seen so far; updated in place
+        metrics: Optional PipelineMetrics receiving dedup time and the
+            frames_deduplicated counter
+        on_duplicate: Optional callable receiving (frame_index,
+            timestamp_str, original_frame_index) for each dropped frame
+    """
+    metrics = metrics or PipelineMetrics()
+    for frame_index, timestamp_str, image in frames:
+        with metrics.timed("dedup"):
+            frame_hash = dhash(image)
+            original = hash_index.lookup(frame_hash, image)
+        if original is not None:
+            metrics.count("frames_deduplicated")
+            if on_duplicate is not None:
+                on_duplicate(frame_index, timestamp_str, original)
+            continue
+        with metrics.timed("dedup"):
+            hash_index.add(frame_hash, frame_index, image)
+        yield frame_index, timestamp_str, image
+
+
+def iter_saved_frames(
+    frames: Iterable[Tuple[int, str, np.ndarray]],
+    artifacts: ArtifactWriter
+) -> Iterator[Tuple[int, str, np.ndarray]]:
+    """Artifact stage: save each frame that continues to OCR"""
+    for frame_index, timestamp_str, image in frames:
+        artifacts.save(frame_artifact_name(frame_index, timestamp_str), image)
+        yield frame_index, timestamp_str, image
+
+
+def new_ocr_timing(params: VideoProcessingRequest) -> dict:
+    """Empty per-video OCR stage timings, filled in by iter_ocr_results"""
+    return {
+        "mode": params.ocr_mode, "engine": get_ocr_engine(params.ocr_engine).name,
+        "frames": 0, "region_detection_ms": 0.0, "ocr_ms": 0.0, "regions": 0, "reused_regions": 0
+    }
+
+
+def iter_ocr_results(
+    frames: Iterable[Tuple[int, str, np.ndarray]],
+    params: VideoProcessingRequest,
+    describe,
+    ocr_timing: dict,
+    on_result: Optional[Callable[[int, str, str, Any], None]] = None,
+    workers: Optional[int] = None,
+    ocr_pool: Optional[Executor] = None
+) -> Iterator[Tuple[int, str, str, Any]]:
+    """
+    OCR stage: read each frame's text and schedule its description
+
+    Inline OCR yields each result as soon as its frame is read. With
+    workers, frames are OCR'd on a process pool while decoding continues
+    and the results are yielded once all frames are done.
+
+    Args:
+        frames: Iterable of (frame_index, timestamp_str, frame)
+        params: Processing parameters (ocr_mode, ocr_engine, ocr_queue_size)
+        describe: Callable taking a frame; its return value (e.g. a future
+            from DescriptionStage.submit) is yielded with the OCR text
+        ocr_timing: Dict from new_ocr_timing; per-frame timings are added
+        on_result: Optional callable receiving each result as it is ready
+        workers: OCR worker processes; defaults to params.ocr_workers
+        ocr_pool: Optional process pool shared across videos for the
+            pipelined mode
+
+    Yields:
+        Tuple of (frame_index, timestamp_str, text, describe result)
+    """
+    workers = params.ocr_workers if workers is None else workers
+
+    def unpack(result):
+        # Fold one frame's OCR stage timings into the per-video totals
+        frame_index, timestamp_str, (extracted_text, timings), description = result
+        ocr_timing["frames"] += 1
+        for key, value in timings.items():
+            ocr_timing[key] += value
+        return frame_index, timestamp_str, extracted_text, description
+
+    if params.ocr_mode == "incremental":
+        # Each frame is diffed against the previous OCR'd one, so OCR stays sequential
+        ocr = IncrementalOCR(params.ocr_engine)
+    else:
+        ocr = functools.partial(text_extractor_timed, ocr_mode=params.ocr_mode, ocr_engine=params.ocr_engine)
+
+    if workers and workers > 0 and params.ocr_mode != "incremental":
+        # Pipelined mode: decode thread -> bounded queue -> OCR processes
+        timed_results = run_pipelined_ocr(
+            frames,
+            ocr,
+            workers=workers,
+            queue_size=params.ocr_queue_size,
+            on_frame=describe,
+            on_result=(lambda i, ts, out, d: on_result(i, ts, out[0], d)) if on_result else None,
+            pool=ocr_pool,
+        )
+        for result in timed_results:
+            yield unpack(result)
+        return
+
+    for frame_index, timestamp_str, image in frames:
+        description = describe(image)
+        result = unpack((frame_index, timestamp_str, ocr(image), description))
+        if on_result is not None:
+            on_result(*result)
+        yield result
+
+
+def finish_ocr_timing(ocr_timing: dict, metrics: PipelineMetrics):
+    """Add the OCR time to metrics and round the totals for the result"""
+    metrics.add_time("ocr", (ocr_timing["region_detection_ms"] + ocr_timing["ocr_ms"]) / 1000)
+    for key in ("region_detection_ms", "ocr_ms"):
+        ocr_timing[key] = round(ocr_timing[key], 1)
+
+
+def _extract_selected_frames(
+    cap,
+    params: VideoProcessingRequest,
+    describe,
+    tracker: Optional[ProgressTracker] = None,
+    artifacts: Optional[ArtifactWriter] = None,
+    metrics: Optional[PipelineMetrics] = None,
+    segment: Optional[Segment] = None,
+    ocr_pool: Optional[Executor] = None
+):
+    """
+    Run change detection and OCR over a video, scheduling a description per frame
+
+    Frames whose perceptual hash matches an already-processed frame (a slide
+    shown again), confirmed pixel-wise against its thumbnail, skip OCR and
+    description; they are returned separately with
+    the index of the frame whose results they reuse.
+
+    Args:
+        cap: Capture from open_video (or an opened cv2.VideoCapture)
+        params: Processing parameters
+        describe: Callable taking a frame; its return value (e.g. a future from
+            DescriptionStage.submit) is kept alongside the OCR text
+        tracker: Optional ProgressTracker notified as frames are decoded and
+            their results become available
+        artifacts: Optional ArtifactWriter receiving each frame sent to OCR
+        metrics: Optional PipelineMetrics receiving per-stage times and
+            frame counters
+        segment: Optional Segment of the video to process
+        ocr_pool: Optional process pool shared across videos, used when
+            params.ocr_workers > 0
+
+    Returns:
+        Tuple of (results, duplicates, ocr_timing, detector): results is a
+        list of (frame_index, timestamp_str, text, describe result) in
+        timestamp order, duplicates a list of (frame_index, timestamp_str,
+        original_frame_index), ocr_timing the summed OCR stage timings and
+        detector the ChangeDetector, whose stats() describe frame selection
+    """
+    duplicates = []
+    metrics = metrics or PipelineMetrics()
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frame_step = frame_step_for(fps, sample_rate=params.sample_rate)
+    detector = make_change_detector(params, fps, frame_step)
+    frames = iter_selected_frames(
+        cap, frame_step, detector, on_sample=tracker.frame_decoded if tracker else None, metrics=metrics,
+        segment=segment
+    )
+
+    if params.dedup_enabled:
+        def on_duplicate(frame_index, timestamp_str, original):
+            duplicates.append((frame_index, timestamp_str, original))
+            if tracker is not None:
+                tracker.duplicate(frame_index, timestamp_str, original)
+
+        frames = iter_unique_frames(
+            frames, FrameHashIndex(max_distance=params.dedup_max_distance), metrics, on_duplicate
+        )
+
+    if artifacts is not None:
+        frames = iter_saved_frames(frames, artifacts)
+
+    ocr_timing = new_ocr_timing(params)
+    results = list(iter_ocr_results(
+        frames, params, describe, ocr_timing, on_result=tracker.ocr_done if tracker else None, ocr_pool=ocr_pool
+    ))
+    finish_ocr_timing(ocr_timing, metrics)
+    return results, duplicates, ocr_timing, detector
+
+
+async def text_extractor_from_path(
+    video_path: str,
+    params: Optional[VideoProcessingRequest] = None,
+    description_stage: Optional[DescriptionStage] = None,
+    video_sha256: Optional[str] = None,
+    on_event: Optional[Callable[[dict], None]] = None,
+    artifact_dir: Optional[str] = None,
+    segment: Optional[Segment] = None,
+    ocr_pool: Optional[Executor] = None
+):
+    """
+    Extract on-screen text and a description for every changed frame of a
+    video file already on disk
+
+    Decoding and OCR run on a worker thread so the event loop stays free, while
+    Gemini descriptions are fanned out concurrently on the loop.
+
+    Args:
+        video_path: Path to the video file
+        params: Processing parameters; ocr_workers > 0 enables the pipelined
+            mode where a decode thread feeds a pool of Tesseract processes
+            (ignored by ocr_mode="incremental", which OCRs frames in order)
+        description_stage: Optional preconfigured DescriptionStage, e.g. one
+            wrapping a fake client
+        video_sha256: Content hash if already known; computed otherwise
+        on_event: Optional callable receiving progress events and each
+            detailed_extraction entry as soon as its frame is processed
+        artifact_dir: Where selected frames are dumped when
+            params.save_frames is set; defaults to extracted_frames/<hash>
+        segment: Optional Segment to process instead of the whole video;
+            segment results never go through the result cache and are not
+            consolidated, as merge_segment_results consolidates the joined
+            entries
+        ocr_pool: Optional process pool shared across videos (e.g. by a
+            batch run) so its Tesseract workers stay warm; used when
+            params.ocr_workers > 0
+
+    Returns:
+        dict with the per-frame detailed_extraction list and summary fields
+    """
+    params = params or VideoProcessingRequest()
+    metrics = PipelineMetrics()
+    start_time = time.time()
+    cap = None
 
     try:
-        # Now use the temporary file path with OpenCV
-        cap = cv2.VideoCapture(temp_file_path)
+
+        if video_sha256 is None:
+            video_sha256 = await asyncio.to_thread(hash_file, video_path)
+
+        # Identical video + parameters: serve the stored result
+        result_key = cache_key(video_sha256, params, MODEL_NAME)
+        use_cache = params.result_cache and segment is None
+        if use_cache:
+            cached = await asyncio.to_thread(load_cached_result, result_key)
+            if cached is not None:
+                print(f"Result cache hit for {video_path}")
+                cached["cache_hit"] = True
+                cached["processing_time"] = round(time.time() - start_time, 2)
+                await asyncio.to_thread(record_job_metrics, "cache_hit", cached["processing_time"])
+                return cached
+
+        cap = open_video(
+            video_path, params.decode_backend, params.decode_gray, params.decode_max_height,
+            params.decode_threads or 0
+        )
 
         # Check if video opened successfully
         if not cap.isOpened():
             raise Exception("Error: Could not open video file")
 
-        fps = cap.get(cv2.CAP_PROP_FPS)  # Frames per second of the video
-        frame_count = 0
-        prev_frame = None
         list_of_texts = []
 
+        stage = None
+        if params.image_descriptions:
+            stage = description_stage or DescriptionStage(
+                concurrency=params.llm_concurrency,
+                rate_limit=params.llm_rate_limit,
+                max_retries=params.llm_max_retries,
+                batch_size=params.llm_batch_size,
+                cache=get_description_cache() if params.description_cache else None,
+            )
 
-        start_time = time.time()
-
-        # # Paths for saving frames
-        # ##mean_diff_folder = "mean_diff_frames"
-        # #std_diff_folder = "std_diff_frames"
-        # std_diff_folder_optical = "std_diff_frames_optical"
-        #
-        # # Create folders if they don't exist
-        # os.makedirs(mean_diff_folder, exist_ok=True)
-        # os.makedirs(std_diff_folder, exist_ok=True)
-        # os.makedirs(std_diff_folder_optical, exist_ok=True)
-
-        while True:
-
-
-            # Read a frame from the video
-            hasFrame, image = cap.read()
-
-            # Break the loop if there are no frames left
-            if not hasFrame:
-                print("End of video reached or cannot fetch the frame.")
-                break
-
-            if prev_frame is not None:
-                # Process each frame
-                mean_diff, std_diff = select_frame(image, prev_frame)
-                timestamp = frame_count / fps
-                timestamp_str = time.strftime('%H:%M:%S', time.gmtime(timestamp))
-                if std_diff > 4:
-                    extracted_text = text_extractor(image)
-                    image_description = extract_screen_description(image)
-                    list_of_texts.append({
-                        "time_stamp": timestamp_str,
-                        "text": extracted_text,
-                        "image_description": image_description
-                    })
-
-            prev_frame = image.copy()
-            frame_count += 1
+        tracker = None
+        if on_event is not None:
+            tracker = ProgressTracker(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), on_event)
 
-        # Clean up
-        cap.release()
-        cv2.destroyAllWindows()
-        del cap
+        artifacts = open_artifact_writer(
+            params.save_frames, artifact_dir or os.path.join(ARTIFACTS_ROOT, video_sha256)
+        )
+
+        describe = stage.submit if stage is not None else no_description
+        if stage is not None:
+            llm_seconds, llm_failures, llm_cache_hits = stage.request_seconds, stage.failures, stage.cache_hits
+
+        # OCR keeps going on the worker thread while descriptions are in flight
+        try:
+            results, duplicates, ocr_timing, detector = await asyncio.to_thread(
+                _extract_selected_frames, cap, params, describe, tracker, artifacts, metrics, segment, ocr_pool
+            )
+        finally:
+            if artifacts is not None:
+                await asyncio.to_thread(artifacts.close)
+        if stage is not None:
+            descriptions = await asyncio.gather(
+                *(asyncio.wrap_future(future) for _, _, _, future in results)
+            )
+            metrics.add_time("llm", stage.request_seconds - llm_seconds)
+            metrics.count("frames_failed", stage.failures - llm_failures)
+            metrics.count("frames_description_cached", stage.cache_hits - llm_cache_hits)
+        else:
+            descriptions = [None] * len(results)
+        serialization_started = time.perf_counter()
+
+        processed = {}
+        for (frame_index, timestamp_str, extracted_text, _), image_description in zip(results, descriptions):
+            processed[frame_index] = (timestamp_str, extracted_text, image_description)
+
+        # Repeated slides reuse the text and description of their first occurrence
+        for frame_index, timestamp_str, original_index in duplicates:
+            _, extracted_text, image_description = processed[original_index]
+            processed[frame_index] = (timestamp_str, extracted_text, image_description)
+
+        for frame_index in sorted(processed):
+            timestamp_str, extracted_text, image_description = processed[frame_index]
+            list_of_texts.append({
+                "time_stamp": timestamp_str,
+                "text": extracted_text,
+                "image_description": image_description
+            })
+
+        frame_count = len(list_of_texts)
+        consolidation = None
+        if params.consolidate and segment is None:
+            # Consecutive entries of the same slide become one segment
+            with metrics.timed("consolidation"):
+                list_of_texts = consolidate_entries(list_of_texts, params.consolidate_similarity)
+            consolidation = {"frames": frame_count, "segments": len(list_of_texts)}
+
+        if tracker is not None:
+            on_event(tracker.progress_event())
 
         processing_time = round(time.time() - start_time, 2)
 
-        print(f"Extracted text from {len(list_of_texts)} frames.")
+        print(f"Extracted text from {frame_count} frames.")
             # ✅ Return a consistent response structure
-        return {
+        result = {
             "success": True,
-            "message": f"Extracted text from {len(list_of_texts)} frames.",
+            "message": f"Extracted text from {frame_count} frames.",
             "extracted_text": [entry["text"] for entry in list_of_texts],
             "detailed_extraction": list_of_texts,
-            "frame_count": len(list_of_texts),
+            "frame_count": frame_count,
+            "segment_count": len(list_of_texts) if consolidation is not None else None,
+            "dedup_cache_hits": len(duplicates),
+            "ocr_timing": ocr_timing,
+            "frame_selection": detector.stats(),
+            "consolidation": consolidation,
             "processing_time": processing_time,
+            "video_sha256": video_sha256,
         }
+        metrics.add_time("serialization", time.perf_counter() - serialization_started)
+        result["metrics"] = metrics.as_dict()
+        # A description that failed (quota, network) would be served from the
+        # cache forever; leave such results out so the next request retries
+        if use_cache and metrics.counters["frames_failed"] == 0 and not has_failed_descriptions(result):
+            with metrics.timed("serialization"):
+                await asyncio.to_thread(store_cached_result, result_key, result)
+        await asyncio.to_thread(record_job_metrics, "completed", processing_time, metrics, segment is not None)
+        return {**result, "cache_hit": False}
 
     except Exception as e:
+        await asyncio.to_thread(
+            record_job_metrics, "failed", round(time.time() - start_time, 2), metrics, segment is not None
+        )
         raise Exception(f"Error processing video: {str(e)}")
+    finally:
+        # Release the decoder (and any ffmpeg/PyAV process) even on failure
+        if cap is not None:
+            cap.release()
+
+
+async def text_extractor_from_video(
+    video_file: "UploadFile",
+    params: Optional[VideoProcessingRequest] = None,
+    description_stage: Optional[DescriptionStage] = None
+):
+    """
+    Extract on-screen text and a description for every changed frame
+
+    Args:
+        video_file: Uploaded video file
+        params: Processing parameters
+        description_stage: Optional preconfigured DescriptionStage, e.g. one
+            wrapping a fake client
 
+    Returns:
+        dict with the per-frame detailed_extraction list and summary fields
+    """
+    print(f"Processing video: {video_file.filename}")
+
+    # Create a temporary file to save the uploaded video
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as temp_file:
+        temp_file_path = temp_file.name
+
+    try:
+        # Stream the uploaded file content to disk chunk by chunk
+        saved = await save_upload(video_file, temp_file_path)
+    except UploadTooLargeError:
+        raise
+    except Exception as e:
+        raise Exception(f"Error saving uploaded file: {str(e)}")
+
+    try:
+        return await text_extractor_from_path(
+            temp_file_path, params, description_stage, video_sha256=saved.sha256
+        )
 
     finally:
         # Clean up the temporary file
         try:
             os.unlink(temp_file_path)
         except Exception as e:
-            print(f"Warning: Could not delete temporary file {temp_file_path}: {str(e)}")
\ No newline at end of file
+            print(f"Warning: Could not delete temporary file {temp_file_path}: {str(e)}")
@@ -0,0 +1,11 @@
+"""
+Throughput benchmark for the extraction pipeline
+
+Usage:
+    python -m benchmark --resolutions 640x360,1280x720 --seconds 20,60
+"""
+
+from benchmark.runner import StubLLMClient, run_benchmark
+from benchmark.synthetic_video import generate_video
+
+__all__ = ["StubLLMClient", "generate_video", "run_benchmark"]
@@ -0,0 +1,67 @@
+import argparse
+import json
+import os
+import tempfile
+
+from app.models.schemas import VideoProcessingRequest
+from benchmark.runner import run_benchmark
+
+
+def _resolution(value: str):
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the extraction pipeline on synthetic videos")
+    parser.add_argument("--resolutions", default="640x360,1280x720",
+                        help="Comma-separated WIDTHxHEIGHT list")
+    parser.add_argument("--seconds", default="20", help="Comma-separated video lengths in seconds")
+    parser.add_argument("--fps", type=float, default=30.0, help="Frame rate of the generated videos")
+    parser.add_argument("--ocr-mode", default="accurate", choices=["accurate", "fast", "incremental"])
+    parser.add_argument("--ocr-engine", default="auto", choices=["auto", "tesserocr", "pytesseract"])
+    parser.add_argument("--ocr-workers", type=int, default=0, help="Tesseract worker processes")
+    parser.add_argument("--sample-rate", type=float, default=None, help="Frames sampled per second")
+    parser.add_argument("--llm-batch-size", type=int, default=4, help="Frames per description request")
+    parser.add_argument("--decode-backend", default="opencv", choices=["opencv", "ffmpeg", "pyav"],
+                        help="Decoding backend used by the pipeline")
+    parser.add_argument("--decode-backends", default="opencv,ffmpeg,pyav",
+                        help="Comma-separated backends whose decode fps is measured (empty to skip)")
+    parser.add_argument("--decode-threads", type=int, default=0, help="Decoder threads; 0 = one per CPU")
+    parser.add_argument("--decode-gray", action="store_true", help="Decode straight to grayscale")
+    parser.add_argument("--decode-max-height", type=int, default=None, help="Downscale taller frames while decoding")
+    parser.add_argument("--llm-latency", type=float, default=0.2,
+                        help="Seconds each stubbed description request takes")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "extraction-benchmark"),
+                        help="Folder for generated videos (reused between runs)")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON report file")
+    args = parser.parse_args()
+
+    params = VideoProcessingRequest(
+        ocr_mode=args.ocr_mode,
+        ocr_engine=args.ocr_engine,
+        ocr_workers=args.ocr_workers,
+        sample_rate=args.sample_rate,
+        llm_batch_size=args.llm_batch_size,
+        decode_backend=args.decode_backend,
+        decode_threads=args.decode_threads,
+        decode_gray=args.decode_gray,
+        decode_max_height=args.decode_max_height,
+    )
+    report = run_benchmark(
+        args.workdir,
+        [_resolution(r) for r in args.resolutions.split(",")],
+        [float(s) for s in args.seconds.split(",")],
+        params,
+        fps=args.fps,
+        llm_latency=args.llm_latency,
+        decode_backends=[b for b in args.decode_backends.split(",") if b],
+    )
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Benchmark report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
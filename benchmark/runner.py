@@ -0,0 +1,205 @@
+"""
+Run the extraction pipeline on synthetic videos and collect throughput metrics
+
+Each scenario runs in a fresh process so peak RSS is measured per scenario,
+and Gemini is replaced by a stub client with a fixed latency so results do
+not depend on the network or on API quota.
+"""
+
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import List, Optional
+
+import cv2
+
+from benchmark.synthetic_video import generate_video
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+class _StubResponse:
+    class prompt_feedback:
+        block_reason = None
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class StubLLMClient:
+    """
+    Stand-in for the Gemini model used by DescriptionStage
+
+    Args:
+        latency: Seconds each request takes
+    """
+
+    def __init__(self, latency: float = 0.2):
+        self.latency = latency
+        self.calls = 0
+
+    async def generate_content_async(self, contents, generation_config=None):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        images = sum(1 for part in contents if isinstance(part, dict))
+        if images > 1:
+            # Batch request: one JSON object per frame
+            return _StubResponse(json.dumps([
+                {"frame": number, "description": f"Synthetic description {self.calls}.{number}"}
+                for number in range(1, images + 1)
+            ]))
+        return _StubResponse(f"Synthetic description {self.calls}")
+
+
+def _peak_rss_mb(children: bool = False) -> Optional[float]:
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    # ru_maxrss is in kilobytes on Linux
+    return round(resource.getrusage(who).ru_maxrss / 1024.0, 1)
+
+
+def _run_scenario(video_path: str, params_json: str, llm_latency: float) -> dict:
+    from app.models.schemas import VideoProcessingRequest
+    from app.services.LLM_service import DescriptionStage, RequestLimiter
+    from app.services.video_service import text_extractor_from_path
+
+    params = VideoProcessingRequest.model_validate_json(params_json)
+
+    async def run():
+        client = StubLLMClient(llm_latency)
+        stage = DescriptionStage(
+            client=client,
+            concurrency=params.llm_concurrency,
+            rate_limit=params.llm_rate_limit,
+            max_retries=params.llm_max_retries,
+            batch_size=params.llm_batch_size,
+            # The stub is not Gemini; only the scenario's own limits apply
+            limiter=RequestLimiter(params.llm_concurrency, params.llm_rate_limit),
+        )
+        result = await text_extractor_from_path(video_path, params, description_stage=stage)
+        return result, client.calls
+
+    started = time.perf_counter()
+    result, llm_calls = asyncio.run(run())
+    wall = time.perf_counter() - started
+    if not result.get("success"):
+        raise RuntimeError(result.get("message"))
+
+    timing = result["ocr_timing"]
+    ocr_frames = timing["frames"] or 1
+    return {
+        "wall_seconds": round(wall, 3),
+        "frames_selected": result["frame_selection"]["selected"],
+        "frames_ocr": timing["frames"],
+        "duplicates": result["dedup_cache_hits"],
+        "llm_calls": llm_calls,
+        "ocr_ms_per_frame": round(timing["ocr_ms"] / ocr_frames, 1),
+        "region_detection_ms_per_frame": round(timing["region_detection_ms"] / ocr_frames, 1),
+        "ocr_timing": timing,
+        "frame_selection": result.get("frame_selection"),
+        "stages_ms": result["metrics"]["stages_ms"],
+        "peak_rss_mb": _peak_rss_mb(),
+        # OCR worker processes, once they have exited
+        "peak_children_rss_mb": _peak_rss_mb(children=True),
+    }
+
+
+def measure_decode(video_path: str, backend: str, params) -> dict:
+    """
+    Decode a video with one backend the way the pipeline samples it, without
+    running any other stage
+
+    Returns:
+        dict with frames, seconds and fps, or an error when the backend is
+        unavailable
+    """
+    from app.services.decoding import open_video
+    from app.services.frame_source import frame_step_for, iter_sampled_frames
+
+    report = {"backend": backend, "gray": params.decode_gray, "max_height": params.decode_max_height}
+    try:
+        cap = open_video(video_path, backend, params.decode_gray, params.decode_max_height, params.decode_threads or 0)
+    except RuntimeError as e:
+        return {**report, "error": str(e)}
+    try:
+        if not cap.isOpened():
+            return {**report, "error": "could not open video"}
+        frame_step = frame_step_for(cap.get(cv2.CAP_PROP_FPS), sample_rate=params.sample_rate)
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        started = time.perf_counter()
+        samples = sum(1 for _ in iter_sampled_frames(cap, frame_step))
+        seconds = time.perf_counter() - started
+    finally:
+        cap.release()
+    # Frames between samples are decoded too, just not converted
+    frames = samples * frame_step if total_frames <= 0 else min(samples * frame_step, total_frames)
+    return {**report, "samples": samples, "frames": frames, "seconds": round(seconds, 3),
+            "fps": round(frames / seconds, 1)}
+
+
+def run_benchmark(
+    workdir: str,
+    resolutions: List[tuple],
+    lengths: List[float],
+    params,
+    fps: float = 30.0,
+    llm_latency: float = 0.2,
+    decode_backends: Optional[List[str]] = None
+) -> dict:
+    """
+    Generate one synthetic video per resolution and length and process each
+
+    Args:
+        workdir: Folder for the generated videos; existing ones are reused
+        resolutions: List of (width, height)
+        lengths: Video lengths in seconds
+        params: VideoProcessingRequest applied to every scenario; the result
+            cache is always disabled
+        fps: Frame rate of the generated videos
+        llm_latency: Seconds each stubbed description request takes
+        decode_backends: Backends whose decode fps is measured on each
+            video, decoding alone, before the pipeline runs
+
+    Returns:
+        dict: {"params": ..., "scenarios": [...]} ready to be dumped as JSON
+    """
+    os.makedirs(workdir, exist_ok=True)
+    params = params.model_copy(update={"result_cache": False})
+    scenarios = []
+    for width, height in resolutions:
+        for seconds in lengths:
+            video_path = os.path.join(workdir, f"synthetic_{width}x{height}_{seconds:g}s_{fps:g}fps.mp4")
+            frames = int(seconds * fps)
+            if not os.path.exists(video_path):
+                frames = generate_video(video_path, width, height, seconds, fps)
+
+            decode = [measure_decode(video_path, backend, params) for backend in decode_backends or []]
+
+            # Fresh process per scenario so peak RSS is not carried over
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                metrics = pool.submit(
+                    _run_scenario, video_path, params.model_dump_json(), llm_latency
+                ).result()
+
+            scenarios.append({
+                "video": {"width": width, "height": height, "seconds": seconds, "fps": fps, "frames": frames},
+                "frames_decoded": frames,
+                # Whole pipeline throughput; "decode" has decode-only fps per backend
+                "frames_per_sec": round(frames / metrics["wall_seconds"], 1),
+                "decode": decode,
+                **metrics,
+            })
+            print(f"{width}x{height} {seconds:g}s: {metrics['wall_seconds']}s, "
+                  f"{metrics['frames_selected']} frames selected")
+            for backend in decode:
+                print(f"  decode {backend['backend']}: " + (
+                    f"{backend['fps']} fps" if "fps" in backend else backend["error"]
+                ))
+    return {"params": params.model_dump(), "llm_latency": llm_latency, "scenarios": scenarios}
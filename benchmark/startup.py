@@ -0,0 +1,125 @@
+"""
+Import-time and cold-start figures
+
+Every measurement runs in a fresh interpreter, as a job worker or a
+run_extraction.py subprocess would, without GOOGLE_API_KEY so an OCR-only
+start that still needed it would fail here.
+
+Usage:
+    python -m benchmark.startup --output startup_results.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmark.synthetic_video import generate_video
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Entry points whose import cost is paid on every process start
+IMPORT_TARGETS = (
+    "app.services.job_queue",
+    "app.services.video_service",
+    "run_extraction",
+    "main",
+)
+
+# Modules reported as loaded or not after each import
+HEAVY_MODULES = ("google.generativeai", "fastapi", "PIL", "pytesseract", "tesserocr")
+
+_IMPORT_SNIPPET = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+print(json.dumps({{
+    "import_ms": round((time.perf_counter() - started) * 1000, 1),
+    "loaded": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+_COLD_START_SNIPPET = """
+import json, sys, time
+started = time.perf_counter()
+import asyncio
+from app.models.schemas import VideoProcessingRequest
+from app.services.video_service import text_extractor_from_path
+imported = time.perf_counter()
+params = VideoProcessingRequest(image_descriptions=False, result_cache=False, ocr_mode="fast")
+result = asyncio.run(text_extractor_from_path({video!r}, params))
+print(json.dumps({{
+    "import_ms": round((imported - started) * 1000, 1),
+    "extraction_ms": round((time.perf_counter() - imported) * 1000, 1),
+    "frames_selected": result["frame_selection"]["selected"],
+    "llm_loaded": "google.generativeai" in sys.modules,
+}}))
+"""
+
+
+def _run_python(code: str, workdir: str) -> dict:
+    """Run code in a fresh interpreter; returns its JSON output plus wall_ms"""
+    env = {key: value for key, value in os.environ.items() if key != "GOOGLE_API_KEY"}
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_ROOT, env.get("PYTHONPATH")]))
+    # Metrics and caches of the measured runs stay in the scratch folder
+    for name, filename in (("METRICS_DB_PATH", "metrics.sqlite3"), ("RESULT_CACHE_PATH", "result_cache.sqlite3")):
+        env[name] = os.path.join(workdir, filename)
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", code], cwd=REPO_ROOT, env=env, capture_output=True, text=True
+    )
+    wall_ms = round((time.perf_counter() - started) * 1000, 1)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr else "failed")
+    return {**json.loads(completed.stdout.strip().splitlines()[-1]), "wall_ms": wall_ms}
+
+
+def measure_startup(workdir: str, repeats: int = 3) -> dict:
+    """
+    Measure interpreter start, module import and OCR-only cold-start times
+
+    Args:
+        workdir: Folder for the synthetic video and scratch databases
+        repeats: Runs per measurement; the fastest is reported, as the
+            others mostly add disk-cache noise
+
+    Returns:
+        dict ready to be dumped as JSON
+    """
+    os.makedirs(workdir, exist_ok=True)
+    video_path = os.path.join(workdir, "startup_640x360_10s.mp4")
+    if not os.path.exists(video_path):
+        generate_video(video_path, 640, 360, seconds=10.0)
+
+    def fastest(code: str) -> dict:
+        runs = [_run_python(code, workdir) for _ in range(repeats)]
+        return min(runs, key=lambda run: run["wall_ms"])
+
+    report = {"python": sys.version.split()[0], "interpreter_ms": fastest("print('{}')")["wall_ms"], "imports": {}}
+    for module in IMPORT_TARGETS:
+        report["imports"][module] = fastest(_IMPORT_SNIPPET.format(module=module, heavy=HEAVY_MODULES))
+        print(f"import {module}: {report['imports'][module]['import_ms']} ms")
+    report["ocr_only_cold_start"] = fastest(_COLD_START_SNIPPET.format(video=video_path))
+    print(f"OCR-only cold start: {report['ocr_only_cold_start']['wall_ms']} ms")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import and cold-start times in fresh interpreters")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per measurement (fastest is kept)")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "extraction-benchmark"),
+                        help="Folder for the generated video and scratch databases")
+    parser.add_argument("--output", default="startup_results.json", help="JSON report file")
+    args = parser.parse_args()
+
+    report = measure_startup(args.workdir, args.repeats)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Startup report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
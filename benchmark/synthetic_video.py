@@ -0,0 +1,122 @@
+"""
+Synthetic lecture-style videos for benchmarking, rendered offline with OpenCV
+
+A video is a sequence of slides. Each slide builds up its bullets one by one,
+slides change with a short crossfade, and every few slides a code listing
+scrolls upwards like a screencast. Low-amplitude noise imitates compression
+grain so consecutive frames are never bit-identical.
+"""
+
+from typing import Tuple
+
+import cv2
+import numpy as np
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+CODE_LINES = [
+    "def fib(n):",
+    "    if n < 2:",
+    "        return n",
+    "    return fib(n - 1) + fib(n - 2)",
+    "",
+    "memo = {}",
+    "def fib_memo(n):",
+    "    if n not in memo:",
+    "        memo[n] = n if n < 2 else fib_memo(n - 1) + fib_memo(n - 2)",
+    "    return memo[n]",
+    "",
+    "for i in range(30):",
+    "    print(i, fib_memo(i))",
+]
+
+
+def _render_slide(size: Tuple[int, int], slide: int, bullets: int) -> np.ndarray:
+    width, height = size
+    unit = height / 360.0
+    image = np.full((height, width, 3), 255, np.uint8)
+    cv2.putText(image, f"Lecture {slide + 1}: Topic {slide + 1}", (int(40 * unit), int(70 * unit)),
+                FONT, 1.3 * unit, (20, 20, 20), max(1, int(3 * unit)))
+    for b in range(bullets):
+        cv2.putText(image, f"- point {b + 1} about topic {slide + 1}",
+                    (int(60 * unit), int((140 + 45 * b) * unit)),
+                    FONT, 0.9 * unit, (40, 40, 40), max(1, int(2 * unit)))
+    return image
+
+
+def _render_code(size: Tuple[int, int], offset: float) -> np.ndarray:
+    width, height = size
+    unit = height / 360.0
+    image = np.full((height, width, 3), 30, np.uint8)
+    line_height = 32 * unit
+    for i, line in enumerate(CODE_LINES * 3):
+        y = int(50 * unit + i * line_height - offset)
+        if -line_height < y < height + line_height:
+            cv2.putText(image, line, (int(30 * unit), y), FONT, 0.7 * unit, (220, 220, 220),
+                        max(1, int(2 * unit)))
+    return image
+
+
+def generate_video(
+    path: str,
+    width: int = 640,
+    height: int = 360,
+    seconds: float = 20.0,
+    fps: float = 30.0,
+    slide_seconds: float = 6.0,
+    bullets: int = 4,
+    transition_seconds: float = 0.5,
+    noise: int = 2,
+    seed: int = 0
+) -> int:
+    """
+    Write a synthetic lecture video
+
+    Args:
+        path: Output file (.mp4)
+        width: Frame width in pixels
+        height: Frame height in pixels
+        seconds: Video length
+        fps: Frame rate
+        slide_seconds: Time spent on each slide, including its build-up
+        bullets: Bullets revealed one by one on each slide
+        transition_seconds: Crossfade length between slides
+        noise: Amplitude of the per-pixel noise (0 disables it)
+        seed: Random seed for the noise
+
+    Returns:
+        int: Number of frames written
+    """
+    size = (width, height)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    if not writer.isOpened():
+        raise RuntimeError(f"Could not open video writer for {path}")
+
+    rng = np.random.default_rng(seed)
+    total = int(seconds * fps)
+    slide_frames = max(1, int(slide_seconds * fps))
+    fade_frames = int(transition_seconds * fps)
+
+    def frame_for(index: int) -> np.ndarray:
+        slide, position = divmod(index, slide_frames)
+        progress = position / float(slide_frames)
+        if slide % 4 == 3:
+            # Screencast segment: code scrolling upwards
+            return _render_code(size, progress * height)
+        return _render_slide(size, slide, 1 + min(bullets - 1, int(progress * bullets)))
+
+    try:
+        for index in range(total):
+            image = frame_for(index)
+            position = index % slide_frames
+            if index >= slide_frames and position < fade_frames:
+                alpha = position / float(fade_frames)
+                previous = frame_for(index - position - 1)
+                image = cv2.addWeighted(image, alpha, previous, 1.0 - alpha, 0)
+            if noise:
+                grain = rng.integers(-noise, noise + 1, image.shape, dtype=np.int16)
+                image = np.clip(image.astype(np.int16) + grain, 0, 255).astype(np.uint8)
+            writer.write(image)
+    finally:
+        writer.release()
+    return total
@@ -69,6 +69,7 @@ export default function ResultView({ preview, result }) {
                 {entry.time_stamp && (
                   <Typography variant="body2" color="text.secondary" sx={{ mb: 1 }}>
                     🕒 Timestamp: {entry.time_stamp}
+                    {entry.end_time && entry.end_time !== entry.time_stamp && ` – ${entry.end_time}`}
                   </Typography>
                 )}
 
@@ -1,92 +1,264 @@
 # frontend_router.py
+import asyncio
+import os
+import time
 import uuid
-import json
-import sys
-import subprocess
-import threading
+import shutil
 from pathlib import Path
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse, FileResponse
+from typing import Literal, Optional
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
+from app.models.schemas import VideoProcessingRequest
+from app.services.LLM_service import MODEL_NAME
+from app.services.job_queue import (
+    JOBS_ROOT, RESULT_FILENAME, JobQueue, QueueFullError, WorkerPool
+)
+from app.services.live_stream import check_stream_url, run_live_extraction
+from app.services.progress import EVENTS_FILENAME, format_sse, read_new_events
+from app.services.result_cache import cache_key, load_cached_result
+from app.services.result_store import get_result_store, parse_timestamp
+from app.services.upload_service import UploadTooLargeError, save_upload
 
-router = APIRouter()
-JOBS_ROOT = Path("jobs")
 JOBS_ROOT.mkdir(exist_ok=True)
 
-# in-memory job store (persisted results saved under jobs/<job_id>/result.json)
-jobs = {}
+# seconds between checks for new job events, and between keep-alive comments
+STREAM_POLL_INTERVAL = 0.5
+STREAM_KEEPALIVE = 15
+
+# live streams are processed in the API process; each one keeps a core busy
+LIVE_MAX_SESSIONS = int(os.environ.get("LIVE_MAX_SESSIONS", "2"))
+live_sessions = 0
+
+# persistent job store; results live in the result store, not in memory
+job_queue = JobQueue()
+worker_pool = WorkerPool()
+
+
+def start_workers():
+    worker_pool.start()
+
+
+def stop_workers():
+    worker_pool.stop()
+
+
+router = APIRouter(on_startup=[start_workers], on_shutdown=[stop_workers])
+
 
 @router.post("/api/upload")
-async def upload_video(file: UploadFile = File(...)):
+async def upload_video(file: UploadFile = File(...), priority: int = 0):
     # create job id & folder
     job_id = str(uuid.uuid4())
     job_dir = JOBS_ROOT / job_id
     job_dir.mkdir(parents=True, exist_ok=True)
 
-    # save uploaded file
-    video_path = job_dir / file.filename
-    with open(video_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
+    # stream uploaded file to disk in chunks
+    video_path = job_dir / Path(file.filename).name
+    try:
+        saved = await save_upload(file, str(video_path))
+    except UploadTooLargeError as e:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        raise HTTPException(status_code=413, detail=str(e))
 
-    jobs[job_id] = {"status": "queued", "result": None, "error": None}
+    params = VideoProcessingRequest()
 
-    # launch extraction in background thread (subprocess)
-    def run_job():
-        try:
-            jobs[job_id]["status"] = "processing"
-            # call run_extraction.py using the same python executable
-            proc = subprocess.Popen(
-                [sys.executable, "run_extraction.py", "--video", str(video_path), "--output", str(job_dir)],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            out, err = proc.communicate()
-            if proc.returncode != 0:
-                jobs[job_id]["status"] = "failed"
-                jobs[job_id]["error"] = err.decode(errors="replace")
-                return
+    # same video already processed with default parameters: no worker needed
+    cached = load_cached_result(cache_key(saved.sha256, params, MODEL_NAME))
+    if cached is not None:
+        cached["cache_hit"] = True
+        get_result_store().save(job_id, cached)
+        job_queue.record(job_id, "completed", str(job_dir), saved.sha256)
+        return JSONResponse({"job_id": job_id, "status": "completed"}, status_code=201)
 
-            # prefer reading result.json file if present
-            result_file = job_dir / "result.json"
-            if result_file.exists():
-                with open(result_file, "r", encoding="utf-8") as rf:
-                    result = json.load(rf)
-            else:
-                # else try decode stdout
-                try:
-                    result = json.loads(out.decode())
-                except Exception:
-                    result = {"stdout": out.decode(errors="replace"), "stderr": err.decode(errors="replace")}
-            jobs[job_id]["status"] = "completed"
-            jobs[job_id]["result"] = result
-            # store result on disk
-            with open(job_dir / "result.json", "w", encoding="utf-8") as rf:
-                json.dump(result, rf, ensure_ascii=False, indent=2)
-        except Exception as e:
-            jobs[job_id]["status"] = "failed"
-            jobs[job_id]["error"] = str(e)
-
-    threading.Thread(target=run_job, daemon=True).start()
+    # hand the job to the worker pool; reject when too many are waiting
+    try:
+        job_queue.enqueue(job_id, str(video_path), str(job_dir), params, priority, saved.sha256)
+    except QueueFullError as e:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
 
     return JSONResponse({"job_id": job_id, "status": "queued"}, status_code=201)
 
 
 @router.get("/api/status/{job_id}")
 def job_status(job_id: str):
-    j = jobs.get(job_id)
+    j = job_queue.get(job_id)
     if not j:
         raise HTTPException(status_code=404, detail="job not found")
     return {"job_id": job_id, "status": j["status"], "error": j.get("error")}
 
 
+def _stored_result_summary(job: dict) -> Optional[dict]:
+    """Summary of a completed job's result, importing a legacy result.json on first access"""
+    store = get_result_store()
+    summary = store.summary(job["id"])
+    if summary is None and store.import_file(job["id"], str(Path(job["output_dir"]) / RESULT_FILENAME)):
+        summary = store.summary(job["id"])
+    return summary
+
+
+def _time_param(value: Optional[str], name: str) -> Optional[int]:
+    if value is None:
+        return None
+    try:
+        return parse_timestamp(value)
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"{name} must be HH:MM:SS or seconds")
+
+
 @router.get("/api/result/{job_id}")
-def job_result(job_id: str):
-    j = jobs.get(job_id)
+def job_result(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    from_: Optional[str] = Query(None, alias="from"),
+    to: Optional[str] = None,
+):
+    """
+    Result of a completed job; offset/limit page through the entries and
+    from/to (HH:MM:SS) restrict them to a time range
+    """
+    j = job_queue.get(job_id)
     if not j:
         raise HTTPException(status_code=404, detail="job not found")
     if j["status"] != "completed":
         raise HTTPException(status_code=400, detail=f"job status is {j['status']}")
-    return j["result"]
+
+    summary = _stored_result_summary(j)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="result not found")
+    start, end = _time_param(from_, "from"), _time_param(to, "to")
+    store = get_result_store()
+    entries = store.entries(job_id, offset, limit, start, end)
+    total = summary.pop("entry_count")
+    if start is not None or end is not None:
+        total = store.count(job_id, start, end)
+    return {
+        **summary,
+        "extracted_text": [entry["text"] for entry in entries],
+        "detailed_extraction": entries,
+        "total_entries": total,
+        "offset": offset,
+        "limit": limit,
+    }
+
+
+@router.get("/api/stream/{job_id}")
+async def job_stream(job_id: str):
+    """
+    Server-Sent Events feed of a job: progress events, one entry event per
+    processed frame as soon as it is ready, and a final done event
+    """
+    if not job_queue.get(job_id):
+        raise HTTPException(status_code=404, detail="job not found")
+
+    async def events():
+        events_path = str(JOBS_ROOT / job_id / EVENTS_FILENAME)
+        offset = 0
+        last_sent = time.monotonic()
+        while True:
+            new_events, offset = read_new_events(events_path, offset)
+            for event in new_events:
+                yield format_sse(event)
+                if event.get("type") == "done":
+                    return
+            if new_events:
+                last_sent = time.monotonic()
+                continue
+
+            j = job_queue.get(job_id)
+            if j is None or j["status"] in ("completed", "failed"):
+                # finished without an event log (e.g. served from the result cache)
+                if j is not None and j["status"] == "completed" and not os.path.exists(events_path):
+                    _stored_result_summary(j)
+                    for entry in get_result_store().iter_entries(job_id):
+                        yield format_sse({"type": "entry", **entry})
+                # the log may have been completed since the last read
+                new_events, offset = read_new_events(events_path, offset)
+                for event in new_events:
+                    yield format_sse(event)
+                    if event.get("type") == "done":
+                        return
+                yield format_sse({
+                    "type": "done",
+                    "status": j["status"] if j else "failed",
+                    "error": j.get("error") if j else "job not found",
+                })
+                return
+
+            if time.monotonic() - last_sent > STREAM_KEEPALIVE:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+            await asyncio.sleep(STREAM_POLL_INTERVAL)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/api/search")
+def search_results(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    job_id: Optional[str] = None,
+    order: Literal["recent", "relevance"] = "recent",
+):
+    """Full-text search over the OCR text and descriptions of all completed jobs"""
+    started = time.perf_counter()
+    hits = get_result_store().search(q, limit, offset, job_id, order)
+    return {
+        "query": q,
+        "results": hits,
+        "offset": offset,
+        "limit": limit,
+        "took_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+@router.get("/api/live")
+async def live_stream(
+    url: str = Query(..., min_length=1),
+    max_seconds: Optional[float] = Query(None, gt=0),
+    sample_rate: Optional[float] = Query(None, gt=0),
+):
+    """
+    Server-Sent Events feed of a live RTSP/RTMP/HLS stream: one entry event
+    per new slide as it appears, periodic progress events, and a done event
+    when the stream ends or max_seconds pass
+    """
+    try:
+        await asyncio.to_thread(check_stream_url, url)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if live_sessions >= LIVE_MAX_SESSIONS:
+        raise HTTPException(status_code=503, detail="too many live streams", headers={"Retry-After": "30"})
+
+    params = VideoProcessingRequest(sample_rate=sample_rate, ocr_mode="fast")
+
+    async def events():
+        global live_sessions
+        # counted once the response starts, so a request dropped before
+        # that never holds a slot
+        if live_sessions >= LIVE_MAX_SESSIONS:
+            yield format_sse({"type": "done", "status": "failed", "error": "too many live streams"})
+            return
+        live_sessions += 1
+        try:
+            async for event in run_live_extraction(url, params, max_seconds=max_seconds):
+                yield format_sse(event)
+        except Exception as e:
+            yield format_sse({"type": "done", "status": "failed", "error": str(e)})
+        finally:
+            live_sessions -= 1
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/api/download/{job_id}/{filename}")
@@ -1,8 +1,10 @@
 from importlib import reload
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 
 from app.routes import video_processing
+from app.services.metrics import get_metrics_store
 
 from fastapi.middleware.cors import CORSMiddleware
 from frontend_router import router as frontend_router
@@ -35,6 +37,16 @@ app.add_middleware(
 app.include_router(frontend_router)
 
 app.include_router(video_processing.router, prefix="/api/v1", tags=["video"])
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    """Aggregate pipeline metrics of all extractions in the Prometheus text format"""
+    return PlainTextResponse(
+        get_metrics_store().render_prometheus(), media_type="text/plain; version=0.0.4"
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -1,45 +1,259 @@
-from app.services.video_service import text_extractor_from_video
-from fastapi import UploadFile
-import aiofiles
+from app.models.schemas import VideoProcessingRequest
+from app.services.decoding import open_video
+from app.services.description_cache import get_description_cache
+from app.services.LLM_service import DescriptionStage
+from app.services.ocr_pool import create_ocr_pool
+from app.services.video_service import VIDEO_EXTENSIONS, text_extractor_from_path
 import asyncio
+import cv2
+import json
+import os
+import time
+from typing import List, Optional, Set
 
-async def extract_video(video_path: str, output_dir: str):
+# Files a batch run writes into its output directory
+BATCH_RESULTS_FILE = "results.jsonl"
+BATCH_SUMMARY_FILE = "summary.json"
+
+
+async def extract_video(video_path: str, output_dir: str, params: VideoProcessingRequest = None):
     """
     Connects to real video text extraction
+
+    The video is decoded in place; it is neither copied nor read into memory.
+    """
+    print(f"Processing video: {video_path}")
+    return await text_extractor_from_path(video_path, params)
+
+
+def find_videos(source: str) -> List[str]:
     """
-    # Simulate UploadFile for compatibility
-    class DummyUploadFile:
-        def __init__(self, filename):
-            self.filename = filename
-        async def read(self):
-            async with aiofiles.open(filename, "rb") as f:
-                return await f.read()
+    List the videos of a batch
 
-    dummy_file = DummyUploadFile(video_path)
-    result = await text_extractor_from_video(dummy_file)
+    Args:
+        source: Directory searched recursively for video files, or a
+            manifest with one path per line (blank lines and # comments are
+            skipped; relative paths are relative to the manifest)
+
+    Returns:
+        Absolute paths in a stable order, without repeats
+    """
+    if os.path.isdir(source):
+        paths = []
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            paths.extend(
+                os.path.join(root, name) for name in sorted(files)
+                if os.path.splitext(name.lower())[1] in VIDEO_EXTENSIONS
+            )
+    else:
+        base = os.path.dirname(os.path.abspath(source))
+        with open(source, "r", encoding="utf-8") as f:
+            paths = [
+                os.path.join(base, line.strip()) for line in f
+                if line.strip() and not line.lstrip().startswith("#")
+            ]
+    return list(dict.fromkeys(os.path.abspath(path) for path in paths))
+
+
+def load_completed(results_path: str) -> Set[str]:
+    """Videos recorded as successful in an earlier run's results file"""
+    completed = set()
+    if not os.path.exists(results_path):
+        return completed
+    with open(results_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Line cut short by an interrupted run
+                continue
+            if record.get("success"):
+                completed.add(record["video"])
+    return completed
+
+
+def video_duration(video_path: str, params: VideoProcessingRequest) -> Optional[float]:
+    """Length of a video in seconds from its container, or None if unknown"""
+    cap = open_video(video_path, params.decode_backend)
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        total_frames = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+    finally:
+        cap.release()
+    return round(total_frames / fps, 2) if fps > 0 and total_frames > 0 else None
+
+
+async def run_batch(
+    videos: List[str],
+    output_dir: str,
+    params: Optional[VideoProcessingRequest] = None,
+    jobs: int = 1,
+    description_stage: Optional[DescriptionStage] = None
+) -> dict:
+    """
+    Process many videos in one warm process
 
-    # Convert Pydantic model -> dict if needed
-    if hasattr(result, "dict"):
-        result = result.dict()
+    Each finished video is appended to output_dir/results.jsonl as one JSON
+    line (its result plus "video" and "duration_seconds", or success=false
+    and the error). Videos already recorded there as successful are skipped,
+    so an interrupted run resumes where it stopped. Up to `jobs` videos are
+    processed at once; with params.ocr_workers > 0 they share one OCR
+    process pool whose Tesseract workers stay loaded between videos, and
+    descriptions go through one DescriptionStage so its rate limit covers
+    the whole batch.
+
+    Args:
+        videos: Video paths, e.g. from find_videos
+        output_dir: Folder for results.jsonl and summary.json
+        params: Processing parameters applied to every video
+        jobs: Videos processed concurrently
+        description_stage: Optional preconfigured DescriptionStage, e.g. one
+            wrapping a fake client
+
+    Returns:
+        Summary with counts and throughput, also written to
+        output_dir/summary.json
+    """
+    params = params or VideoProcessingRequest()
+    os.makedirs(output_dir, exist_ok=True)
+    results_path = os.path.join(output_dir, BATCH_RESULTS_FILE)
+    completed = load_completed(results_path)
+    pending = [video for video in videos if video not in completed]
+    print(f"{len(videos)} videos, {len(videos) - len(pending)} already done, {len(pending)} to process")
+
+    stage = None
+    if params.image_descriptions:
+        stage = description_stage or DescriptionStage(
+            concurrency=params.llm_concurrency,
+            rate_limit=params.llm_rate_limit,
+            max_retries=params.llm_max_retries,
+            batch_size=params.llm_batch_size,
+            cache=get_description_cache() if params.description_cache else None,
+        )
+    pool = create_ocr_pool(params.ocr_workers) if params.ocr_workers and params.ocr_workers > 0 else None
+
+    summary = {
+        "videos": len(videos),
+        "skipped": len(videos) - len(pending),
+        "completed": 0,
+        "failed": 0,
+        "cache_hits": 0,
+        "entries": 0,
+        "video_seconds": 0.0,
+        "processing_seconds": 0.0,
+    }
+    started = time.time()
+
+    async def process(video: str) -> dict:
+        video_started = time.time()
+        try:
+            duration = await asyncio.to_thread(video_duration, video, params)
+            result = await text_extractor_from_path(video, params, stage, ocr_pool=pool)
+            return {"video": video, "duration_seconds": duration, **result}
+        except Exception as e:
+            return {
+                "video": video,
+                "success": False,
+                "error": str(e),
+                "processing_time": round(time.time() - video_started, 2),
+            }
+
+    # A line cut short by an interrupted run must not swallow the next record
+    if os.path.exists(results_path) and os.path.getsize(results_path) > 0:
+        with open(results_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b"\n"
+    else:
+        needs_newline = False
+
+    try:
+        with open(results_path, "a", encoding="utf-8") as out:
+            if needs_newline:
+                out.write("\n")
+            remaining = iter(pending)
+
+            async def worker():
+                # Workers share one iterator, so each video is taken once
+                for video in remaining:
+                    record = await process(video)
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+
+                    summary["processing_seconds"] += record.get("processing_time") or 0.0
+                    if record["success"]:
+                        summary["completed"] += 1
+                        summary["cache_hits"] += int(bool(record.get("cache_hit")))
+                        entries = len(record.get("detailed_extraction") or [])
+                        summary["entries"] += entries
+                        summary["video_seconds"] += record.get("duration_seconds") or 0.0
+                        outcome = f"{entries} entries in {record.get('processing_time')}s"
+                    else:
+                        summary["failed"] += 1
+                        outcome = f"failed: {record['error']}"
+                    done = summary["completed"] + summary["failed"]
+                    print(f"[{done}/{len(pending)}] {video}: {outcome}", flush=True)
+
+            await asyncio.gather(*(worker() for _ in range(max(1, jobs))))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        wall_seconds = time.time() - started
+        processed = summary["completed"] + summary["failed"]
+        summary.update({
+            "video_seconds": round(summary["video_seconds"], 2),
+            "processing_seconds": round(summary["processing_seconds"], 2),
+            "wall_seconds": round(wall_seconds, 2),
+            "videos_per_hour": round(processed / wall_seconds * 3600, 1) if wall_seconds > 0 else None,
+            # Seconds of video processed per second of wall time
+            "realtime_factor": round(summary["video_seconds"] / wall_seconds, 2) if wall_seconds > 0 else None,
+            "params": params.model_dump(),
+            "jobs": jobs,
+        })
+        with open(os.path.join(output_dir, BATCH_SUMMARY_FILE), "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+    return summary
 
-    return result
 
 def main():
-    import argparse, json
+    import argparse
     from pathlib import Path
 
     parser = argparse.ArgumentParser()
-    parser.add_argument("--video", required=True, help="Path to video file")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--video", help="Path to video file")
+    source.add_argument("--batch", metavar="DIR_OR_MANIFEST",
+                        help="Directory of videos, or a file listing one video path per line")
     parser.add_argument("--output", default="output", help="Output directory")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Videos processed at once in batch mode")
+    parser.add_argument("--ocr-workers", type=int, default=0,
+                        help="Tesseract worker processes (0 = OCR inline); shared by all videos of a batch")
+    parser.add_argument("--sample-rate", type=float, default=None,
+                        help="Frames sampled per second of video (default: every frame)")
+    parser.add_argument("--ocr-only", action="store_true",
+                        help="Skip Gemini image descriptions (no API key or google.generativeai needed)")
     args = parser.parse_args()
+    params = VideoProcessingRequest(
+        ocr_workers=args.ocr_workers, sample_rate=args.sample_rate, image_descriptions=not args.ocr_only
+    )
 
     out_dir = Path(args.output)
     out_dir.mkdir(parents=True, exist_ok=True)
 
+    if args.batch:
+        summary = asyncio.run(run_batch(find_videos(args.batch), str(out_dir), params, jobs=args.jobs))
+        print(json.dumps(summary))
+        return
+
     # run async extractor
-    result = asyncio.run(extract_video(args.video, str(out_dir)))
+    result = asyncio.run(extract_video(args.video, str(out_dir), params))
 
     # save + print
     with open(out_dir / "result.json", "w", encoding="utf-8") as f:
         json.dump(result, f, ensure_ascii=False, indent=2)
     print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
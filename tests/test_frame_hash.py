@@ -0,0 +1,49 @@
+import os
+
+import cv2
+import numpy as np
+
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+from app.services.frame_hash import FrameHashIndex, dhash
+from app.services.metrics import PipelineMetrics
+from app.services.video_service import iter_unique_frames
+
+
+def _slide(formula: str) -> np.ndarray:
+    frame = np.full((720, 1280, 3), 255, np.uint8)
+    cv2.putText(frame, "Linear functions", (60, 100), cv2.FONT_HERSHEY_SIMPLEX, 1.6, (30, 30, 30), 3)
+    cv2.putText(frame, formula, (80, 220), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (20, 20, 20), 2)
+    return frame
+
+
+def _reencode(frame: np.ndarray, quality: int = 30) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    noisy = np.clip(frame.astype(np.int16) + rng.normal(0, 4, frame.shape), 0, 255).astype(np.uint8)
+    return cv2.imdecode(cv2.imencode(".jpg", noisy, [cv2.IMWRITE_JPEG_QUALITY, quality])[1], cv2.IMREAD_COLOR)
+
+
+def test_near_identical_slides_are_not_deduplicated():
+    first, second = _slide("y = x + 1"), _slide("y = x + 2")
+    index = FrameHashIndex(max_distance=2)
+    index.add(dhash(first), 0, first)
+
+    # The hash alone cannot tell the slides apart; the thumbnail check must
+    assert index.lookup(dhash(second)) == 0
+    assert index.lookup(dhash(second), second) is None
+    assert index.rejected == 1
+
+
+def test_reencoded_repeat_is_deduplicated():
+    slide = _slide("y = x + 1")
+    frames = [(0, "00:00:00", slide), (30, "00:00:01", _slide("y = x + 2")), (60, "00:00:02", _reencode(slide))]
+    duplicates = []
+    metrics = PipelineMetrics()
+
+    unique = list(iter_unique_frames(
+        frames, FrameHashIndex(max_distance=2), metrics, lambda *duplicate: duplicates.append(duplicate)
+    ))
+
+    assert [frame_index for frame_index, _, _ in unique] == [0, 30]
+    assert duplicates == [(60, "00:00:02", 0)]
+    assert metrics.counters["frames_deduplicated"] == 1
@@ -0,0 +1,89 @@
+import asyncio
+import os
+
+import pytest
+
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+from app.models.schemas import VideoProcessingRequest
+from app.services import metrics, ocr_engine, result_cache
+from app.services.LLM_service import DescriptionStage, RequestLimiter
+from app.services.video_service import text_extractor_from_path
+from benchmark.synthetic_video import generate_video
+
+
+class FakeOCREngine(ocr_engine.OCREngine):
+    """OCR stand-in so the tests run without Tesseract language data"""
+
+    name = "fake"
+
+    def image_to_string(self, image):
+        return "Slide text"
+
+    def image_to_data(self, image):
+        return {"text": ["Slide", "text"], "conf": [90, 90]}
+
+
+class QuotaExceededClient:
+    """Gemini stand-in that answers every request with a quota error"""
+
+    async def generate_content_async(self, contents, generation_config=None):
+        raise RuntimeError("429 quota exceeded")
+
+
+class DescribingClient:
+    """Gemini stand-in that describes every frame"""
+
+    async def generate_content_async(self, contents, generation_config=None):
+        class Response:
+            text = "A slide"
+
+            class prompt_feedback:
+                block_reason = None
+
+        return Response()
+
+
+@pytest.fixture
+def isolated_stores(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache, "_default_cache", result_cache.ResultCache(str(tmp_path / "results.sqlite3")))
+    monkeypatch.setattr(metrics, "_default_store", metrics.MetricsStore(str(tmp_path / "metrics.sqlite3")))
+
+
+@pytest.fixture(autouse=True)
+def fake_ocr(monkeypatch):
+    engine = FakeOCREngine()
+    monkeypatch.setattr(ocr_engine, "_engines", {"tesserocr": engine, "pytesseract": engine})
+
+
+@pytest.fixture(scope="module")
+def video(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("video") / "lecture.mp4")
+    generate_video(path, seconds=4.0, slide_seconds=2.0, bullets=1)
+    return path
+
+
+def _extract(video_path: str, client) -> dict:
+    params = VideoProcessingRequest(
+        ocr_mode="fast", sample_rate=2, llm_batch_size=1, llm_max_retries=0, description_cache=False
+    )
+
+    async def run():
+        stage = DescriptionStage(client=client, max_retries=0, limiter=RequestLimiter(4, None))
+        return await text_extractor_from_path(video_path, params, description_stage=stage)
+
+    return asyncio.run(run())
+
+
+def test_failed_descriptions_are_not_cached(video, isolated_stores):
+    failed = _extract(video, QuotaExceededClient())
+    assert failed["metrics"]["counters"]["frames_failed"] > 0
+    assert result_cache.has_failed_descriptions(failed)
+
+    retried = _extract(video, DescribingClient())
+    assert retried["cache_hit"] is False
+    assert not result_cache.has_failed_descriptions(retried)
+
+    cached = _extract(video, QuotaExceededClient())
+    assert cached["cache_hit"] is True
+    assert cached["detailed_extraction"] == retried["detailed_extraction"]